@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from financials import stream_company
+from pipeline import DEFAULT_ASSUMPTIONS, flatten, run_valuation, summarize
+from stress import CRISIS_PERIODS
+
+# --- Command line ---
+# python alphastack.py value TCS.NS INFY.NS --wacc 11 --format csv
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="alphastack", description="AlphaStack DCF valuation without the UI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    value = sub.add_parser("value", help="Value one or more tickers.")
+    value.add_argument("tickers", nargs="+")
+    value.add_argument("--growth", type=float, default=DEFAULT_ASSUMPTIONS["revenue_growth"], help="Revenue growth %%")
+    value.add_argument("--terminal-growth", type=float, default=DEFAULT_ASSUMPTIONS["terminal_growth"])
+    value.add_argument("--ebit-margin", type=float, default=DEFAULT_ASSUMPTIONS["ebit_margin"])
+    value.add_argument("--tax-rate", type=float, default=DEFAULT_ASSUMPTIONS["tax_rate"])
+    value.add_argument("--wacc", type=float, default=DEFAULT_ASSUMPTIONS["discount_rate"])
+    value.add_argument("--years", type=int, default=DEFAULT_ASSUMPTIONS["forecast_years"])
+    value.add_argument("--fade-years", type=int, default=DEFAULT_ASSUMPTIONS["fade_years"],
+                       help="Years of linear fade from --growth to --terminal-growth after the forecast.")
+    value.add_argument("--stress", choices=["All Events", *CRISIS_PERIODS], help="Crisis window to replay.")
+    value.add_argument("--financials", help="CSV/XLSX in the upload template layout (optionally with a Ticker column).")
+    value.add_argument("--format", choices=["json", "csv"], default="json")
+    value.add_argument("--output", "-o", help="Write to this file instead of stdout.")
+    return parser
+
+
+def cmd_value(args):
+    assumptions = dict(revenue_growth=args.growth, terminal_growth=args.terminal_growth, ebit_margin=args.ebit_margin,
+                       tax_rate=args.tax_rate, discount_rate=args.wacc, forecast_years=args.years,
+                       fade_years=args.fade_years)
+    results = [run_valuation(t, financials=stream_company(args.financials, t) if args.financials else None,
+                             stress_event=args.stress, **assumptions) for t in args.tickers]
+
+    if args.format == "csv":
+        text = pd.DataFrame([flatten(r) for r in results]).to_csv(index=False)
+    else:
+        text = json.dumps([summarize(r) for r in results], indent=2, default=str)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + ("" if text.endswith("\n") else "\n"))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "value":
+        cmd_value(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,104 @@
+import io
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
-import plotly.graph_objects as go
+
+from bulk import bulk_valuation, parse_tickers, tickers_from_frame
+from dcf import sensitivity_grid
+from financials import stream_company, stream_summary, value_companies
+from market_data import INTERACTIVE_MAX_STALE, default_provider
+from patterns import PATTERNS
+from montecarlo import correlation_matrix, default_distributions, simulate
+from peers import SectorIndex, multiples_from_info, peer_table, relative_valuation, symbol
+import perf
+from pipeline import cached_valuation, fetch_market_data
+from stress import CRISIS_PERIODS
 
 # --- Page Config ---
 st.set_page_config(page_title="AlphaStack: Valuation + Technical Insights", layout="wide")
 st.title("📊 AlphaStack: Valuation + Technical Insights")
 st.markdown("Get DCF valuation, peer comparison, technical patterns, and stress test simulation — all in one place.")
 
+# Interactive sessions serve expired data at once and refresh it in the background.
+provider = st.cache_resource(default_provider)(max_stale=INTERACTIVE_MAX_STALE)
+sector_index = SectorIndex(provider.store)
+tracer = perf.start()
+
+# Heavy optional modules (plotly, yfinance, openpyxl, pandas-ta) are imported where their
+# feature is first used, so a fresh session renders the form without paying for them.
+
+
+# Uploads are parsed in chunks (read-only openpyxl for XLSX), so large files never sit in
+# memory as one DataFrame.
+@st.cache_data(show_spinner=False)
+def upload_company(data, name, ticker):
+    return stream_company(io.BytesIO(data), ticker, name=name)
+
+
+@st.cache_data(show_spinner="Summarising upload…")
+def upload_summary(data, name, tax_rate):
+    return stream_summary(io.BytesIO(data), name=name, tax_rate=tax_rate)
+
+
+# Called last in every mode (Bulk Screen stops the script early), so the profiler is always stopped.
+def render_performance(tracer, profiler):
+    profile_report = profiler.stop() if profiler else None
+    with st.expander("⏱️ Performance"):
+        totals = tracer.totals() if tracer.spans else pd.Series(dtype=float)
+        for col, category in zip(st.columns(4), ["fetch", "parse", "compute", "render"]):
+            col.metric(category.title(), f"{totals.get(category, 0.0):.1f} ms")
+        c = tracer.counters
+        st.write(f"Network calls: **{c['network_calls']}** | Cache hits: **{c['cache.memory_hits']}** memory, "
+                 f"**{c['cache.disk_hits']}** disk | Misses: **{c['cache.misses']}** | "
+                 f"Shared in-flight fetches: **{c['fetch.coalesced']}** | "
+                 f"Shared valuations: **{c['valuation.shared_hits']}** | "
+                 f"Stale entries served: **{c['cache.stale_hits']}**")
+        st.dataframe(tracer.to_frame().round(2), use_container_width=True)
+        st.download_button("📥 Export Trace (Chrome/Perfetto JSON)", tracer.to_chrome_trace(), "alphastack_trace.json")
+        if profile_report:
+            st.text(profile_report)
+
+
+def format_age(seconds):
+    for unit, size in (("d", 86400), ("h", 3600), ("min", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.0f} {unit}"
+    return f"{seconds:.0f} s"
+
+
 # --- Sidebar ---
 st.sidebar.header("⚙️ Settings")
-stress_event = st.sidebar.selectbox("Stress Test Event", ["None", "COVID-19 (2020)", "2008 Financial Crisis", "Scam 1992", "Dotcom Bubble"])
+stress_event = st.sidebar.selectbox("Stress Test Event", ["None", "All Events", *CRISIS_PERIODS])
+mode = st.sidebar.radio("Mode", ["Single Ticker", "Bulk Screen"])
+grid_size = st.sidebar.slider("Sensitivity Grid Size", 5, 50, 25)
+run_monte_carlo = st.sidebar.checkbox("Monte Carlo Simulation")
+if run_monte_carlo:
+    with st.sidebar.expander("🎲 Monte Carlo Settings", expanded=True):
+        mc_paths = st.select_slider("Paths", [10_000, 100_000, 250_000, 500_000, 1_000_000], value=100_000)
+        mc_spread = st.slider("Assumption Spread (x default)", 0.25, 3.0, 1.0)
+        mc_rho_growth_margin = st.slider("Growth ↔ Margin Correlation", -0.9, 0.9, 0.3)
+        mc_rho_wacc_terminal = st.slider("WACC ↔ Terminal Growth Correlation", -0.9, 0.9, 0.3)
+        mc_seed = st.number_input("Seed", value=42, step=1)
+with st.sidebar.expander("⏱️ Profiling"):
+    profile_backend = st.selectbox("Profile each run with", ["Off", "cProfile", "pyinstrument"])
+profiler = None
+if profile_backend != "Off":
+    try:
+        profiler = perf.Profile(profile_backend)
+        profiler.start()
+    except ImportError:
+        st.sidebar.warning(f"{profile_backend} is not installed.")
 
 # --- Ticker Input ---
-ticker = st.text_input("Ticker (e.g., TCS.NS)", value="TCS.NS")
+if mode == "Single Ticker":
+    ticker = st.text_input("Ticker (e.g., TCS.NS)", value="TCS.NS")
+    extra_peers = st.sidebar.text_area("Extra Peers (comma separated)", value="",
+                                       help="Peers in the same industry are found automatically among tickers seen before.")
+else:
+    tickers_text = st.text_area("Tickers (comma or newline separated)", value="TCS.NS\nINFY.NS\nRELIANCE.NS")
+    tickers_file = st.file_uploader("…or upload a ticker list (CSV/TXT, one per row or a Ticker column)", type=["csv", "txt"])
+    max_workers = st.sidebar.slider("Parallel Fetches", 1, 32, 8)
 
 # --- Assumptions ---
 st.subheader("🔧 DCF Assumptions")
@@ -28,6 +112,8 @@ with col2:
 with col3:
     discount_rate = st.slider("WACC %", 0.0, 30.0, 10.0)
     forecast_years = st.slider("Forecast Years", 1, 10, 5)
+    fade_years = st.slider("Fade Years", 0, 10, 0, help="Years over which growth fades linearly to terminal growth "
+                                                        "after the forecast (0 = single-stage).")
 # ✅ Add Explanation Table Here
 with st.expander("📘 What Do These Inputs Mean?"):
     explain_df = pd.DataFrame({
@@ -37,7 +123,8 @@ with st.expander("📘 What Do These Inputs Mean?"):
             "EBIT Margin %",
             "Tax Rate %",
             "WACC %",
-            "Forecast Years"
+            "Forecast Years",
+            "Fade Years"
         ],
         "Meaning": [
             "Expected annual revenue growth during forecast period.",
@@ -45,7 +132,8 @@ with st.expander("📘 What Do These Inputs Mean?"):
             "Percentage of revenue that remains as EBIT (profitability).",
             "Percentage of EBIT paid as tax to calculate NOPAT.",
             "Discount rate (cost of capital) used to discount future cash flows.",
-            "Number of years into the future for which cash flows are projected."
+            "Number of years into the future for which cash flows are projected.",
+            "Years after the forecast in which growth steps down linearly to the terminal rate."
         ],
         "Impact on Valuation": [
             "Higher growth increases future cash flows and valuation.",
@@ -53,16 +141,40 @@ with st.expander("📘 What Do These Inputs Mean?"):
             "Higher margins mean more profit and higher cash flows.",
             "Higher taxes reduce free cash flows, lowering valuation.",
             "Higher WACC decreases present value of future cash flows.",
-            "Longer forecasts show more growth but add more uncertainty."
+            "Longer forecasts show more growth but add more uncertainty.",
+            "A gradual fade is less abrupt than jumping straight to terminal growth."
         ]
     })
 
     st.dataframe(explain_df, use_container_width=True)
 
+# --- Bulk Screen ---
+if mode == "Bulk Screen":
+    if st.button("🚀 Run Bulk Valuation"):
+        tickers = parse_tickers(tickers_text)
+        if tickers_file:
+            tickers = list(dict.fromkeys(tickers + tickers_from_frame(pd.read_csv(tickers_file, header=None if tickers_file.name.endswith(".txt") else "infer"))))
+        assumptions = dict(revenue_growth=revenue_growth, terminal_growth=terminal_growth, ebit_margin=ebit_margin,
+                           tax_rate=tax_rate, discount_rate=discount_rate, forecast_years=forecast_years,
+                           fade_years=fade_years)
+        progress = st.progress(0.0, text=f"Valuing {len(tickers)} tickers…")
+        table = st.empty()
+        results = pd.DataFrame()
+        with perf.stage("fetch.bulk"):
+            for chunk in bulk_valuation(provider, tickers, assumptions, chunk_size=10, max_workers=max_workers,
+                                        sector_index=sector_index):
+                results = pd.concat([results, chunk], ignore_index=True)
+                table.dataframe(results.sort_values("Upside %", ascending=False), use_container_width=True)
+                progress.progress(len(results) / len(tickers), text=f"Valued {len(results)}/{len(tickers)} tickers")
+        st.download_button("📥 Download Results", results.to_csv(index=False).encode(), "bulk_valuation.csv")
+    render_performance(tracer, profiler)
+    st.stop()
+
 
 # --- File Upload ---
 st.subheader("📂 Optional Financials Upload")
-uploaded_file = st.file_uploader("CSV/XLSX: Year,Revenue,EBIT,CapEx,Dep,ΔWC,Cash,Debt,Shares", type=["csv", "xlsx"])
+uploaded_file = st.file_uploader("CSV/XLSX/Parquet/Arrow: [Ticker,]Year,Revenue,EBIT,CapEx,Dep,ΔWC,Cash,Debt,Shares",
+                                 type=["csv", "xlsx", "parquet", "arrow", "feather"])
 
 # --- Sample Template ---
 with st.expander("📘 Sample Upload Template"):
@@ -80,130 +192,186 @@ with st.expander("📘 Sample Upload Template"):
     st.dataframe(sample_df)
     csv = sample_df.to_csv(index=False).encode()
     st.download_button("📥 Download Sample Template", csv, "sample_template.csv")
+    st.caption("Add a Ticker column to upload many companies in one file.")
+
+# --- Uploaded Financials Analysis ---
+if uploaded_file:
+    with st.expander("📊 Uploaded Financials: Multi-Year Analysis", expanded=False):
+        try:
+            with perf.stage("parse.upload"):
+                summary = upload_summary(uploaded_file.getvalue(), uploaded_file.name, tax_rate)
+            valued = value_companies(summary, tax_rate, revenue_growth, discount_rate, terminal_growth, forecast_years,
+                                     fade_years=fade_years, ebit_margin=ebit_margin)
+            st.write(f"{len(valued):,} companies, {int(valued['Years'].sum()):,} company-years. "
+                     "Growth Used % is each company's revenue CAGR; base FCF takes latest revenue at the "
+                     f"{ebit_margin:.1f}% EBIT margin, as in the single-ticker valuation.")
+            st.dataframe(valued.round(2), use_container_width=True)
+        except Exception as e:
+            st.error(f"❌ Could not analyse upload: {e}")
 
 # --- Main Action ---
-if st.button("🚀 Generate Valuation"):
+# Fetched data lives in session state; every later rerun (slider, toggle, upload) only
+# re-runs the I/O-free valuation on it.
+generate = st.button("🚀 Generate Valuation")
+if generate:
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        name = info.get("shortName", "N/A")
-        sector = info.get("sector", "N/A")
-        industry = info.get("industry", "N/A")
-        market_cap = info.get("marketCap", 0)
-        pe_ratio = info.get("trailingPE", "N/A")
-        div_yield = info.get("dividendYield", 0.0) * 100
-
-        st.markdown(f"### 🏢 {name} | {industry}")
-        st.write(f"Market Cap: ₹{market_cap / 1e12:.2f}T | PE: {pe_ratio} | Div Yield: {div_yield:.2f}%")
-
-        # --- Load Data ---
-        if uploaded_file:
-            df = pd.read_csv(uploaded_file) if uploaded_file.name.endswith(".csv") else pd.read_excel(uploaded_file)
-            latest = df.iloc[-1]
-            revenue = latest["Revenue"]
-            ebit = latest["EBIT"]
-            capex = latest["CapEx"]
-            dep = latest["Dep"]
-            wc = latest["ΔWC"]
-            cash = latest["Cash"]
-            debt = latest["Debt"]
-            shares = latest["Shares"]
-            growth_rate = ((df["Revenue"].iloc[-1] - df["Revenue"].iloc[0]) / df["Revenue"].iloc[0]) * 100 / (len(df)-1)
-            revenue_growth = round(growth_rate, 2)
-        else:
-            revenue = info.get("totalRevenue", 1000)
-            ebit = revenue * (ebit_margin / 100)
-            capex, dep, wc = 100, 50, -20
-            cash = info.get("totalCash", 100)
-            debt = info.get("totalDebt", 50)
-            shares = info.get("sharesOutstanding", 50)
-
-        tax = ebit * (tax_rate / 100)
-        nopat = ebit - tax
-        fcf = nopat + dep - capex - wc
-
-        # --- DCF ---
-        cash_flows = []
-        for year in range(1, forecast_years + 1):
-            proj_fcf = fcf * ((1 + revenue_growth / 100) ** year)
-            disc_fcf = proj_fcf / ((1 + discount_rate / 100) ** year)
-            cash_flows.append((year, round(proj_fcf, 2), round(disc_fcf, 2)))
-
-        df_cf = pd.DataFrame(cash_flows, columns=["Year", "Projected FCF", "Discounted FCF"])
-        st.subheader("🔢 Forecasted Cash Flows")
-        st.dataframe(df_cf)
+        with st.spinner(f"Fetching {ticker}…"):
+            data = fetch_market_data(ticker, provider)
+            sector_index.register(ticker, data["info"])
+            peer_tickers = list(dict.fromkeys(sector_index.peers(ticker) + parse_tickers(extra_peers)))
+            with perf.stage("fetch.peers"):
+                data["peers"] = peer_table(provider, [ticker] + peer_tickers, key=data["info"].get("industry"))
+            st.session_state["market_data"] = data
+    except Exception as e:
+        st.error(f"❌ Something went wrong: {e}")
 
-        terminal_val = (cash_flows[-1][1] * (1 + terminal_growth / 100)) / (discount_rate / 100 - terminal_growth / 100)
-        disc_terminal = terminal_val / ((1 + discount_rate / 100) ** forecast_years)
-        ev = sum(df_cf["Discounted FCF"]) + disc_terminal
-        equity_val = ev + cash - debt
-        intrinsic_val = equity_val / shares
+market_data = st.session_state.get("market_data")
+if market_data is not None and market_data.get("stale") and not generate:
+    # Expired entries were served while a background refresh ran; pick up its result (a cheap memory read).
+    with perf.stage("fetch.revalidated"):
+        market_data = {**fetch_market_data(market_data["ticker"], provider), "peers": market_data.get("peers")}
+    st.session_state["market_data"] = market_data
+if market_data is not None:
+    try:
+        if market_data["ticker"] != ticker:
+            st.caption(f"Showing {market_data['ticker']}. Press Generate Valuation to load {ticker}.")
+        with perf.stage("parse.upload"):
+            financials = upload_company(uploaded_file.getvalue(), uploaded_file.name, market_data["ticker"]) if uploaded_file else None
+        # Valuations are shared with every replica through the provider's store.
+        result = cached_valuation(provider.store, market_data, financials=financials,
+                                  stress_event=None if stress_event == "None" else stress_event,
+                                  revenue_growth=revenue_growth, terminal_growth=terminal_growth, ebit_margin=ebit_margin,
+                                  tax_rate=tax_rate, discount_rate=discount_rate, forecast_years=forecast_years,
+                                  fade_years=fade_years)
+
+        st.markdown(f"### 🏢 {result['name']} | {result['industry']}")
+        if market_data.get("stale"):
+            ages = ", ".join(f"{endpoint} {format_age(age)} old" for endpoint, age in market_data["stale"].items())
+            st.caption(f"⏳ Cached data shown ({ages}); refreshing in the background.")
+        st.write(f"Market Cap: ₹{result['market_cap'] / 1e12:.2f}T | PE: {result['pe_ratio']} | Div Yield: {result['div_yield']:.2f}%")
 
+        st.subheader("🔢 Forecasted Cash Flows")
+        source = {"upload": "your uploaded financials", "statements": "the latest reported annual statements",
+                  "estimate": "estimates (no reported statements available)"}[result["fundamentals_source"]]
+        if result["fundamentals_source"] == "estimate" and result["statements_error"]:
+            source = f"estimates (reported statements failed to load: {result['statements_error']})"
+        st.caption(f"Base-year D&A, CapEx, ΔWC, cash, debt and shares from {source}.")
+        st.dataframe(result["cash_flows"])
+
+        ev, equity_val, intrinsic_val = result["ev"], result["equity_value"], result["intrinsic_value"]
         st.subheader("💰 Valuation Summary")
-        st.metric("Enterprise Value", f"₹{ev / 1e12:.2f}T")
-        st.metric("Equity Value", f"₹{equity_val / 1e12:.2f}T")
-        st.metric("Intrinsic Value/share", f"₹{intrinsic_val:,.2f}")
-
-        price = stock.history(period="1d")["Close"].iloc[-1]
-        diff = price - intrinsic_val
-        pct = (diff / price) * 100
-        if pct < 0:
+        col_summary, col_grid = st.columns([1, 2])
+        with col_summary:
+            st.metric("Enterprise Value", f"₹{ev / 1e12:.2f}T")
+            st.metric("Equity Value", f"₹{equity_val / 1e12:.2f}T")
+            st.metric("Intrinsic Value/share", f"₹{intrinsic_val:,.2f}")
+        with col_grid:
+            waccs = np.linspace(max(discount_rate - 5, 0.5), discount_rate + 5, grid_size)
+            tgs = np.linspace(max(terminal_growth - 2, 0.0), terminal_growth + 2, grid_size)
+            f = result["fundamentals"]
+            with perf.stage("compute.sensitivity"):
+                grid = sensitivity_grid(result["fcf"], waccs, tgs, forecast_years, f["cash"], f["debt"], f["shares"],
+                                        revenue_growth=result["assumptions"]["revenue_growth"], fade_years=fade_years)
+            with perf.stage("render.sensitivity"):
+                import plotly.graph_objects as go
+
+                fig_grid = go.Figure(go.Heatmap(z=grid, x=tgs.round(2), y=waccs.round(2), colorscale="RdYlGn",
+                                                colorbar=dict(title="IV ₹")))
+                fig_grid.update_layout(title="Sensitivity: Intrinsic Value/share", xaxis_title="Terminal Growth %",
+                                       yaxis_title="WACC %", height=380, margin=dict(t=40, b=0))
+                st.plotly_chart(fig_grid, use_container_width=True)
+
+        price, pct = result["price"], result["upside_pct"]
+        if pct > 0:
             st.info(f"🧠 Insight: Stock appears **undervalued** by {abs(pct):.1f}% (Mkt ₹{price:.2f} vs IV ₹{intrinsic_val:.2f})")
         else:
             st.warning(f"🧠 Insight: Stock appears **overvalued** by {abs(pct):.1f}% (Mkt ₹{price:.2f} vs IV ₹{intrinsic_val:.2f})")
+        implied_g, implied_r = result["implied_growth"], result["implied_wacc"]
+        st.write("🔁 Reverse DCF: the market price implies "
+                 + (f"**{implied_g:.1f}%** revenue growth (you assume {result['assumptions']['revenue_growth']:.1f}%)"
+                    if np.isfinite(implied_g) else "a revenue growth outside -50%…100%")
+                 + (f" or a **{implied_r:.1f}%** WACC (you assume {discount_rate:.1f}%)." if np.isfinite(implied_r) else "."))
 
         if stress_event != "None":
             st.subheader("🧨 Stress Test Results")
-            crisis_periods = {
-                "COVID-19 (2020)": ("2020-02-01", "2020-04-01"),
-                "2008 Financial Crisis": ("2008-09-01", "2009-03-01"),
-                "Scam 1992": ("1992-03-01", "1992-07-01"),
-                "Dotcom Bubble": ("2000-03-01", "2002-03-01"),
-            }
-            start, end = crisis_periods[stress_event]
-            data = yf.download(ticker, start=start, end=end)
-            if not data.empty:
-                drop_pct = float(((data["Close"].iloc[-1] - data["Close"].iloc[0]) / data["Close"].iloc[0]) * 100)
-                fall_val = float(price * (1 + drop_pct / 100))
+            stress = result["stress"].dropna(subset=["Source"])
+            for _, row in stress.iterrows():
                 st.error(
-                    f"If {stress_event} repeats, estimated price fall: {drop_pct:.2f}%, new price: ₹{fall_val:.2f}")
+                    f"If {row['Event']} repeats, estimated price fall: {row['Endpoint Change %']:.2f}%, new price: ₹{row['Price (Endpoint)']:.2f} "
+                    f"(max drawdown {row['Max Drawdown %']:.2f}% → ₹{row['Price (Max Drawdown)']:.2f})")
+            for _, row in result["stress"][result["stress"]["Source"].isna()].iterrows():
+                st.caption(f"{row['Event']}: no stress result, {row.get('Note') or 'no prices in the window'}.")
+            st.dataframe(result["stress"].round(2), use_container_width=True)
+
+        # --- Peer Comparison ---
+        peers = market_data["peers"].drop(symbol(market_data["ticker"]), errors="ignore")
+        st.subheader(f"👥 Peer Comparison ({len(peers)} peers in {result['industry']})")
+        if len(peers):
+            with perf.stage("compute.peers"):
+                relative = relative_valuation(multiples_from_info(market_data["info"]), peers)
+            st.dataframe(relative.round(2), use_container_width=True)
+            st.caption("Percentile = share of peers with a lower multiple. Implied Price = target at the peer median.")
+            with st.expander("📋 Peer Multiples"):
+                st.dataframe(peers.sort_values("Market Cap", ascending=False).round(2), use_container_width=True)
+        else:
+            st.caption("No peers indexed yet. Run a Bulk Screen or add Extra Peers in the sidebar.")
+
+        if run_monte_carlo:
+            st.subheader("🎲 Monte Carlo Valuation")
+            correlation = correlation_matrix({("revenue_growth", "ebit_margin"): mc_rho_growth_margin,
+                                              ("discount_rate", "terminal_growth"): mc_rho_wacc_terminal})
+            with perf.stage("compute.monte_carlo"):
+                sim = simulate(result["fundamentals"], default_distributions(result["assumptions"], mc_spread),
+                               forecast_years, n_paths=mc_paths, correlation=correlation, seed=int(mc_seed),
+                               fade_years=fade_years)
+            values = sim["values"]
+            lo, hi = np.percentile(values, [1, 99])
+            counts, edges = np.histogram(values, bins=80, range=(lo, hi))
+            with perf.stage("render.monte_carlo"):
+                import plotly.graph_objects as go
+
+                fig_mc = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, marker_color="steelblue"))
+                fig_mc.add_vline(x=price, line_dash="dash", annotation_text="Market Price")
+                fig_mc.update_layout(xaxis_title="Intrinsic Value/share (₹, 1st–99th pct)", yaxis_title="Paths",
+                                     bargap=0, height=350)
+                st.plotly_chart(fig_mc, use_container_width=True)
+            st.dataframe(pd.DataFrame({"Percentile": [f"P{p}" for p in sim["percentiles"]],
+                                       "Intrinsic Value/share": [round(v, 2) for v in sim["percentiles"].values()]}))
+            st.write(f"Probability IV > market price: **{(values > price).mean() * 100:.1f}%** "
+                     f"({sim['n_valid']:,} of {sim['n_paths']:,} paths valid)")
 
         # --- Chart ---
         st.subheader("📈 Price Chart + Technical Pattern (30D)")
-        hist = stock.history(period="1mo")
-        fig = go.Figure(data=[go.Candlestick(x=hist.index, open=hist['Open'], high=hist['High'],
-                                             low=hist['Low'], close=hist['Close'])])
-        st.plotly_chart(fig, use_container_width=True)
+        with perf.stage("render.chart"):
+            import plotly.graph_objects as go
+
+            hist = result["history"]
+            flags = result["pattern_flags"]
+            fig = go.Figure(data=[go.Candlestick(x=hist.index, open=hist['Open'], high=hist['High'],
+                                                 low=hist['Low'], close=hist['Close'], name="Price")])
+            for bias, marker, y, color in [("bullish", "triangle-up", hist["Low"] * 0.99, "green"),
+                                           ("bearish", "triangle-down", hist["High"] * 1.01, "red")]:
+                cols = [p for p in flags.columns if PATTERNS[p][1] == bias]
+                hit = flags[cols].any(axis=1)
+                labels = flags[cols].apply(lambda row: ", ".join(row.index[row]), axis=1)
+                fig.add_trace(go.Scatter(x=hist.index[hit], y=y[hit], mode="markers", name=bias.title(),
+                                         marker=dict(symbol=marker, size=10, color=color), text=labels[hit]))
+            st.plotly_chart(fig, use_container_width=True)
 
         # --- Technical Summary ---
         st.subheader("🧠 Technical Pattern: Summary")
-        def detect_doji(df):
-            return abs(df['Close'] - df['Open']) < (df['High'] - df['Low']) * 0.1
-
-        def detect_hammer(df):
-            body = abs(df['Close'] - df['Open'])
-            lower = df['Open'] - df['Low']
-            upper = df['High'] - df['Close']
-            return (lower > 2 * body) & (upper < body)
-
-        hist = hist.dropna()
-        patterns = {
-            "Doji": detect_doji(hist),
-            "Hammer": detect_hammer(hist),
-        }
-
-        for pattern, condition in patterns.items():
-            count = int(condition.sum())
-            st.write(f"🔹 {pattern} appeared **{count}** times")
+        bias_icon = {"bullish": "🟢", "bearish": "🔴", "neutral": "⚪"}
+        for pattern, count in result["patterns"].items():
+            if count:
+                st.write(f"{bias_icon[PATTERNS[pattern][1]]} {pattern} appeared **{count}** times")
+        with st.expander("📘 Pattern Flags per Bar"):
+            by_bar = flags.apply(lambda row: ", ".join(row.index[row]), axis=1)
+            st.dataframe(by_bar[by_bar != ""].rename("Patterns"), use_container_width=True)
 
         st.caption("📘 All results are for educational purposes only. No investment advice.")
 
     except Exception as e:
         st.error(f"❌ Something went wrong: {e}")
 
-
-
-
-
-
-
+# --- Performance ---
+render_performance(tracer, profiler)
@@ -0,0 +1,77 @@
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_data import CachedProvider, FakeProvider  # noqa: E402
+
+# --- Benchmark suite ---
+# Offline (FakeProvider stands in for yfinance) benchmarks of the valuation hot paths at
+# several scales. Results are saved under .benchmarks/ and compared with the last run:
+#
+#   python -m pytest benchmarks --benchmark-autosave --benchmark-compare --benchmark-compare-fail=mean:25%
+#
+# Each benchmark also records its peak traced memory in extra_info["peak_mb"] and fails if
+# it exceeds the budget passed to track_memory().
+
+SCALES = [1, 1_000, 100_000]
+
+
+@pytest.fixture(scope="session")
+def fake_provider():
+    return CachedProvider(FakeProvider(start="2015-01-01"))
+
+
+@pytest.fixture(scope="session")
+def rng():
+    return np.random.default_rng(7)
+
+
+@pytest.fixture
+def track_memory(benchmark):
+    """Run fn once under tracemalloc, record the peak and enforce a budget in MB."""
+    def run(fn, budget_mb):
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_mb"] = round(peak, 3)
+        assert peak < budget_mb, f"peak memory {peak:.1f} MB over budget {budget_mb} MB"
+    return run
+
+
+def synthetic_inputs(n, rng):
+    return {
+        "fcf": rng.uniform(1e2, 1e6, n),
+        "revenue_growth": rng.uniform(0, 30, n),
+        "discount_rate": rng.uniform(8, 16, n),
+        "terminal_growth": rng.uniform(0, 6, n),
+        "forecast_years": rng.integers(1, 11, n),
+        "cash": rng.uniform(0, 1e5, n),
+        "debt": rng.uniform(0, 1e5, n),
+        "shares": rng.uniform(1e3, 1e6, n),
+    }
+
+
+def synthetic_financials(n_rows, rng, years=10):
+    companies = max(n_rows // years, 1)
+    n = companies * min(years, n_rows)
+    return pd.DataFrame({
+        "Ticker": np.repeat([f"C{i}" for i in range(companies)], n // companies),
+        "Year": np.tile(np.arange(2025 - n // companies, 2025), companies),
+        "Revenue": rng.uniform(100, 1e4, n),
+        "EBIT": rng.uniform(10, 1e3, n),
+        "CapEx": rng.uniform(5, 100, n),
+        "Dep": rng.uniform(5, 80, n),
+        "ΔWC": rng.uniform(-20, 20, n),
+        "Cash": rng.uniform(10, 500, n),
+        "Debt": rng.uniform(0, 500, n),
+        "Shares": rng.uniform(1, 100, n),
+    })
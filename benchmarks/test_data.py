@@ -0,0 +1,233 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bulk import iter_fetch
+from conftest import synthetic_financials
+from financials import company_summary, normalize, stream_summary
+from market_data import CachedProvider, FakeProvider, HistoryManager, LocalRedis, ParquetStore, RedisStore, SingleFlight
+from patterns import count_many, scan_frame
+from peers import relative_valuation
+from pipeline import run_valuation
+from statements import normalize_statements
+from stress import crisis_stats
+
+UPLOAD_ROWS = [1, 1_000, 100_000]
+
+
+@pytest.fixture(scope="module")
+def upload_files(tmp_path_factory, rng):
+    root = tmp_path_factory.mktemp("uploads")
+    files = {}
+    for n in UPLOAD_ROWS:
+        df = synthetic_financials(n, rng)
+        files[n] = root / f"fin_{n}.csv"
+        df.to_csv(files[n], index=False)
+    return files
+
+
+@pytest.mark.parametrize("n", UPLOAD_ROWS)
+def test_upload_stream_summary(benchmark, track_memory, upload_files, n):
+    summary = benchmark(stream_summary, str(upload_files[n]))
+    assert len(summary) >= 1
+    track_memory(lambda: stream_summary(str(upload_files[n])), budget_mb=60)
+
+
+@pytest.mark.parametrize("n", UPLOAD_ROWS)
+def test_company_summary_in_memory(benchmark, rng, n):
+    table = normalize(synthetic_financials(n, rng))
+    assert len(benchmark(company_summary, table)) >= 1
+
+
+def test_pattern_scan_single_history(benchmark, fake_provider):
+    hist = HistoryManager(fake_provider).full("BENCH.NS")
+    flags = benchmark(scan_frame, hist)
+    assert len(flags) == len(hist)
+
+
+@pytest.mark.parametrize("n_tickers", [1, 100, 1_000])
+def test_pattern_scan_panel(benchmark, fake_provider, n_tickers):
+    prices = HistoryManager(fake_provider)
+    histories = {f"T{i}": prices.window(f"T{i}", period="1y") for i in range(n_tickers)}
+    counts = benchmark(count_many, histories)
+    assert counts.shape[0] == n_tickers
+
+
+@pytest.mark.parametrize("n_tickers", [1, 100])
+def test_stress_stats(benchmark, fake_provider, n_tickers):
+    prices = HistoryManager(fake_provider)
+    histories = {f"S{i}": prices.full(f"S{i}") for i in range(n_tickers)}
+    tables = benchmark(lambda: [crisis_stats(h, t) for t, h in histories.items()])
+    assert len(tables) == n_tickers
+
+
+def test_pipeline_warm_cache(benchmark, tmp_path):
+    # A warm run is served entirely from cache and reproduces the cold run's valuation.
+    upstream = FakeProvider(start="2015-01-01")
+    provider = CachedProvider(upstream, ParquetStore(str(tmp_path / "warm.sqlite")))
+    cold = run_valuation("PIPE.NS", provider=provider, stress_event="All Events")
+    calls = dict(upstream.calls)
+    result = benchmark(run_valuation, "PIPE.NS", provider=provider, stress_event="All Events")
+    assert upstream.calls == calls
+    assert result["intrinsic_value"] == cold["intrinsic_value"] and result["price"] == cold["price"]
+
+
+@pytest.mark.parametrize("n_tickers", [1, 100])
+def test_history_delta_refresh(benchmark, n_tickers):
+    upstream = FakeProvider(start="2015-01-01")
+    provider = CachedProvider(upstream, ttls={"history": 0.0})
+    prices = HistoryManager(provider)
+    tickers = [f"D{i}" for i in range(n_tickers)]
+    for t in tickers:
+        prices.full(t)
+    benchmark(lambda: [prices.full(t) for t in tickers])
+    assert provider.stats["delta_updates"] >= n_tickers
+
+
+class _SplitProvider(FakeProvider):
+    """FakeProvider whose whole series is halved once `split` is set, like auto-adjusted yfinance data."""
+
+    split = False
+
+    def history(self, ticker, period=None, start=None, end=None):
+        df = super().history(ticker, period, start, end)
+        return df.assign(**{c: df[c] / 2 for c in ("Open", "High", "Low", "Close")}) if self.split else df
+
+
+def test_history_refetched_after_split(benchmark):
+    # A back-adjusted overlap bar means the cached series is stale as a whole: re-fetch, don't splice.
+    upstream = _SplitProvider(start="2015-01-01")
+    provider = CachedProvider(upstream, ttls={"history": 0.0})
+    prices = HistoryManager(provider)
+    prices.full("SPLIT.NS")
+    upstream.split = True
+    history = benchmark(prices.full, "SPLIT.NS")
+    assert history["Close"].equals(upstream.history("SPLIT.NS", period="max")["Close"])
+    assert provider.stats["readjusted"] >= 1
+
+
+def test_warm_bulk_fetch_skips_rate_limit(benchmark, tmp_path):
+    # Only upstream requests are rate limited: a warm screen at 1 call/s still finishes at cache speed.
+    upstream = FakeProvider(start="2015-01-01")
+    provider = CachedProvider(upstream, ParquetStore(str(tmp_path / "bulk.sqlite")))
+    tickers = [f"W{i}.NS" for i in range(30)]
+    list(iter_fetch(provider, tickers, calls_per_second=1_000))
+    cold = dict(upstream.calls)
+
+    def warm():
+        start = time.perf_counter()
+        records = list(iter_fetch(provider, tickers, calls_per_second=1))
+        return records, time.perf_counter() - start
+
+    records, elapsed = benchmark(warm)
+    assert all(r["error"] is None for r in records)
+    assert upstream.calls == cold and elapsed < 1.0
+
+
+class _SlowProvider(FakeProvider):
+    """FakeProvider with a network-like round-trip time."""
+
+    def info(self, ticker):
+        time.sleep(0.05)
+        return super().info(ticker)
+
+    def history(self, ticker, period=None, start=None, end=None):
+        time.sleep(0.05)
+        return super().history(ticker, period, start, end)
+
+
+def test_concurrent_sessions_share_fetches(benchmark):
+    # 32 sessions (each with its own cache) ask for the same ticker at once: one upstream call each.
+    def run():
+        upstream = _SlowProvider(start="2015-01-01")
+        flights = SingleFlight()
+        sessions = [CachedProvider(upstream, flights=flights) for _ in range(32)]
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            list(pool.map(lambda p: (p.info("SF.NS"), p.history("SF.NS", period="max")), sessions))
+        return upstream.calls
+
+    calls = benchmark(run)
+    assert calls["info"] == 1 and calls["history"] == 1
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "redis"])
+def test_replicas_share_store(benchmark, tmp_path, backend):
+    # Two replicas (own memory cache, own upstream) on one shared store: the second never fetches.
+    shared = LocalRedis()
+
+    def store():
+        if backend == "redis":
+            return RedisStore(shared)
+        return ParquetStore(str(tmp_path / "shared.sqlite"))
+
+    first = CachedProvider(FakeProvider(start="2015-01-01"), store(), flights=SingleFlight())
+    expected = run_valuation("REP.NS", provider=first, stress_event="All Events")
+
+    def replica():
+        upstream = FakeProvider(start="2015-01-01")
+        provider = CachedProvider(upstream, store(), flights=SingleFlight())
+        return upstream, run_valuation("REP.NS", provider=provider, stress_event="All Events")
+
+    upstream, result = benchmark(replica)
+    assert sum(upstream.calls.values()) == 0
+    assert result["intrinsic_value"] == expected["intrinsic_value"]
+
+
+def test_stale_while_revalidate(benchmark):
+    # Expired entries come back at cache speed while the slow upstream refreshes them in the background.
+    upstream = _SlowProvider(start="2015-01-01")
+    provider = CachedProvider(upstream, ttls={"info": 0.0, "history": 0.0}, flights=SingleFlight(),
+                              max_stale={"info": 60.0, "history": 60.0})
+    provider.info("SWR.NS")
+    provider.history("SWR.NS", period="max")
+
+    def serve():
+        start = time.perf_counter()
+        provider.info("SWR.NS")
+        provider.history("SWR.NS", period="max")
+        return time.perf_counter() - start
+
+    assert benchmark(serve) < 0.05
+    assert provider.stats["stale_hits"] >= 2
+    deadline = time.time() + 5
+    while (upstream.calls["info"] < 2 or provider.stats["delta_updates"] < 1) and time.time() < deadline:
+        time.sleep(0.01)
+    assert upstream.calls["info"] >= 2 and provider.stats["delta_updates"] >= 1
+
+
+def test_relative_valuation(benchmark):
+    # Hand-computed: percentile = share of peers below (ties half), implied price at the peer median.
+    peers = pd.DataFrame({"PE": [10.0, 20.0, 30.0, 40.0], "EV/EBITDA": [5.0, 6.0, 7.0, 8.0],
+                          "P/B": [1.0, 2.0, 3.0, 4.0], "Div Yield %": [1.0, 2.0, 3.0, 4.0]})
+    target = {"PE": 15.0, "EV/EBITDA": 6.0, "P/B": 5.0, "Div Yield %": 2.0, "Price": 100.0,
+              "EBITDA": 10.0, "Cash": 5.0, "Debt": 15.0, "Shares": 2.0}
+    table = benchmark(relative_valuation, target, peers)
+    assert table["Percentile"].tolist() == [25.0, 37.5, 100.0, 37.5]
+    assert table["Peer Median"].tolist() == [25.0, 6.5, 2.5, 2.5]
+    np.testing.assert_allclose(table["Implied Price"], [100 * 25 / 15, (6.5 * 10 + 5 - 15) / 2, 50.0, 80.0])
+    # Lower PE / EV/EBITDA / P/B is cheaper; for dividend yield higher is.
+    assert table["Cheaper Than Peers"].tolist() == [True, True, False, False]
+
+
+def test_normalize_statements(benchmark):
+    # yfinance reports CapEx negative and the cash effect of working capital; the template wants both as uses.
+    dates = pd.to_datetime(["2024-03-31", "2023-03-31"])
+    statements = {
+        "financials": pd.DataFrame([[1200.0, 1000.0], [240.0, 200.0]], columns=dates,
+                                   index=["Operating Revenue", "EBIT"]),
+        "cashflow": pd.DataFrame([[-60.0, -50.0], [-12.0, 10.0]], columns=dates,
+                                 index=["Capital Expenditure", "Change In Working Capital"]),
+        "balance_sheet": pd.DataFrame([[100.0, 90.0], [50.0, 40.0]], columns=dates,
+                                      index=["Cash And Cash Equivalents", "Total Debt"]),
+    }
+    table = benchmark(normalize_statements, statements, "tcs.ns", {"sharesOutstanding": 7.0})
+    assert table["Ticker"].tolist() == ["TCS.NS", "TCS.NS"]
+    assert table["Year"].tolist() == [2023.0, 2024.0]
+    assert table["Revenue"].tolist() == [1000.0, 1200.0]
+    assert table["CapEx"].tolist() == [50.0, 60.0]
+    assert table["ΔWC"].tolist() == [-10.0, 12.0]
+    assert table["Dep"].tolist() == [0.0, 0.0]
+    assert table["Shares"].tolist() == [7.0, 7.0]
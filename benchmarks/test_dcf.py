@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from conftest import SCALES, synthetic_inputs
+from dcf import (batch_dcf, gordon_terminal_value, growth_path, implied_assumption, multistage_dcf,
+                 sensitivity_grid)
+from montecarlo import default_distributions, simulate
+from pipeline import DEFAULT_ASSUMPTIONS
+from projection import project, statement, value_projection
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_batch_dcf(benchmark, track_memory, rng, n):
+    inputs = synthetic_inputs(n, rng)
+    result = benchmark(batch_dcf, **inputs)
+    assert result["intrinsic_value"].shape == (n,)
+    track_memory(lambda: batch_dcf(**inputs), budget_mb=5 + n * 0.0005)
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_terminal_value(benchmark, rng, n):
+    inputs = synthetic_inputs(n, rng)
+    tv, pv = benchmark(gordon_terminal_value, inputs["fcf"], inputs["discount_rate"],
+                       inputs["terminal_growth"], inputs["forecast_years"])
+    assert np.isfinite(pv).all()
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_multistage_dcf(benchmark, track_memory, rng, n):
+    inputs = synthetic_inputs(n, rng)
+    result = benchmark(batch_dcf, **inputs, fade_years=5)
+    assert result["intrinsic_value"].shape == (n,)
+    track_memory(lambda: batch_dcf(**inputs, fade_years=5), budget_mb=5 + n * 0.002)
+
+
+def test_multistage_per_scenario_drivers(benchmark):
+    # A per-scenario tax rate applies to every year of its own scenario, even when scenarios == years.
+    growth = growth_path(np.full(5, 10.0), 3.0, 5)
+    tax = np.array([0.0, 0.0, 0.0, 0.0, 50.0])
+    val = benchmark(multistage_dcf, 100.0, growth, 10.0, 3.0, 0.0, 0.0, 1.0, margin=20.0, tax_rate=tax)
+    iv = val["intrinsic_value"]
+    np.testing.assert_allclose(iv[:4], iv[0])
+    np.testing.assert_allclose(iv[4], iv[0] / 2)
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_revenue_projection(benchmark, track_memory, rng, n):
+    inputs = synthetic_inputs(n, rng)
+    growth = growth_path(inputs["revenue_growth"], inputs["terminal_growth"], inputs["forecast_years"], 3)
+
+    def run():
+        projected = project(inputs["fcf"] * 5, growth, rng.uniform(5, 30, n), 25.0, 3.0, 4.0, 1.0)
+        valuation = value_projection(projected, inputs["discount_rate"], inputs["terminal_growth"],
+                                     inputs["cash"], inputs["debt"], inputs["shares"])
+        return statement(projected, discounted=valuation["discounted"])
+
+    table = benchmark(run)
+    assert len(table) == (inputs["forecast_years"] + 3).sum()
+    track_memory(run, budget_mb=5 + n * 0.004)
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_implied_growth(benchmark, rng, n):
+    inputs = synthetic_inputs(n, rng)
+    price = batch_dcf(**inputs)["intrinsic_value"]
+    implied = benchmark(implied_assumption, price, "revenue_growth", **inputs)
+    assert np.allclose(implied, inputs["revenue_growth"], atol=1e-3)
+
+
+def test_sensitivity_grid_50x50(benchmark):
+    grid = benchmark(sensitivity_grid, 1e6, np.linspace(5, 15, 50), np.linspace(0, 6, 50), 5, 1e5, 5e4, 1e4,
+                     revenue_growth=10)
+    assert grid.shape == (50, 50)
+    if benchmark.stats:
+        assert benchmark.stats.stats.mean < 0.1
+
+
+@pytest.mark.parametrize("n_paths", [1_000, 100_000])
+def test_monte_carlo(benchmark, track_memory, n_paths):
+    fundamentals = dict(revenue=1e6, dep=5e3, capex=6e3, wc=-1e3, cash=1e5, debt=5e4, shares=1e4)
+    dists = default_distributions(DEFAULT_ASSUMPTIONS)
+    result = benchmark(simulate, fundamentals, dists, 5, n_paths=n_paths, seed=1)
+    assert result["n_valid"] > 0.9 * n_paths
+    track_memory(lambda: simulate(fundamentals, dists, 5, n_paths=n_paths, seed=1), budget_mb=20 + n_paths * 0.0003)
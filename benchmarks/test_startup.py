@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only specific features need; none of them may be imported on a cold start.
+LAZY_MODULES = ["yfinance", "openpyxl", "pandas_ta"]
+
+# Cold-start budgets in seconds (fresh interpreter, so import caches do not carry over).
+IMPORT_BUDGET_S = 3.0
+APP_BUDGET_S = 8.0
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+import alphastack, bulk, dcf, financials, market_data, montecarlo, patterns, peers, perf, pipeline, stress
+print(json.dumps({"seconds": time.perf_counter() - t, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+_APP_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(%r, default_timeout=60).run()
+assert not at.exception, at.exception
+print(json.dumps({"seconds": time.perf_counter() - t, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def _cold_start(script, tmp_path):
+    env = dict(os.environ, ALPHASTACK_OFFLINE="1", ALPHASTACK_CACHE_DIR=str(tmp_path), PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_cold_start(benchmark, tmp_path):
+    result = benchmark.pedantic(_cold_start, args=(_IMPORT_SCRIPT % LAZY_MODULES, tmp_path), rounds=3, iterations=1)
+    benchmark.extra_info["seconds"] = round(result["seconds"], 3)
+    assert result["loaded"] == [], f"imported eagerly: {result['loaded']}"
+    assert result["seconds"] < IMPORT_BUDGET_S
+
+
+def test_app_cold_start(benchmark, tmp_path):
+    pytest.importorskip("streamlit")
+    script = _APP_SCRIPT % (os.path.join(ROOT, "app3.py"), LAZY_MODULES)
+    result = benchmark.pedantic(_cold_start, args=(script, tmp_path), rounds=3, iterations=1)
+    benchmark.extra_info["seconds"] = round(result["seconds"], 3)
+    assert result["loaded"] == [], f"imported eagerly: {result['loaded']}"
+    assert result["seconds"] < APP_BUDGET_S
@@ -0,0 +1,200 @@
+import contextvars
+import copy
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from dcf import batch_dcf, free_cash_flow, implied_assumption
+from financials import company_summary, normalize
+from market_data import CachedProvider, HistoryManager, track_staleness
+from pipeline import fundamentals_from_info
+from statements import StatementLibrary
+
+# --- Bulk valuation ---
+# Fetches info, last price and reported statements for many tickers on a bounded thread pool
+# (rate limited, with retries) and values each completed chunk with one batch_dcf call.
+
+# company_summary() column -> fundamentals key
+REPORTED_FIELDS = {"Revenue": "revenue", "EBIT": "ebit", "CapEx": "capex", "Dep": "dep", "ΔWC": "wc",
+                   "Cash": "cash", "Debt": "debt", "Shares": "shares"}
+
+RESULT_COLUMNS = ["Ticker", "Name", "Sector", "Price", "Intrinsic Value", "Upside %", "Implied Growth %", "EV",
+                  "Equity Value", "Fundamentals", "Data Age (s)", "Error"]
+
+
+def parse_tickers(text):
+    """Split a pasted list on commas/whitespace/semicolons, dropping blanks and duplicates."""
+    seen = dict.fromkeys(t.strip().upper() for t in re.split(r"[\s,;]+", text or ""))
+    return [t for t in seen if t]
+
+
+def tickers_from_frame(df):
+    for col in ("Ticker", "Symbol", "ticker", "symbol"):
+        if col in df.columns:
+            return parse_tickers(" ".join(df[col].astype(str)))
+    return parse_tickers(" ".join(df.iloc[:, 0].astype(str)))
+
+
+class RateLimiter:
+    """Spaces calls at least 1 / calls_per_second apart across all threads."""
+
+    def __init__(self, calls_per_second):
+        self.interval = 1.0 / calls_per_second if calls_per_second else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ThrottledProvider:
+    """Upstream wrapper that waits on a RateLimiter before every real request."""
+
+    def __init__(self, provider, limiter):
+        self.provider = provider
+        self.limiter = limiter
+
+    def info(self, ticker):
+        self.limiter.wait()
+        return self.provider.info(ticker)
+
+    def history(self, ticker, period=None, start=None, end=None):
+        self.limiter.wait()
+        return self.provider.history(ticker, period=period, start=start, end=end)
+
+    def statements(self, ticker):
+        self.limiter.wait()
+        return self.provider.statements(ticker)
+
+
+def throttled(provider, limiter):
+    """`provider` with only its upstream requests rate limited; cache hits never wait.
+
+    A CachedProvider is shallow-copied, so the copy shares its memory cache, store, stats and flights.
+    """
+    if isinstance(provider, CachedProvider):
+        view = copy.copy(provider)
+        view.provider = ThrottledProvider(provider.provider, limiter)
+        return view
+    return ThrottledProvider(provider, limiter)
+
+
+def _with_retries(fn, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_ticker(provider, ticker, retries=2, backoff=0.5, statements=None):
+    prices = HistoryManager(provider)
+    with track_staleness() as stale:
+        info = _with_retries(lambda: provider.info(ticker), retries, backoff)
+        price = _with_retries(lambda: prices.last_close(ticker), retries, backoff)
+    reported = statements_error = None
+    if statements is not None:
+        # Statements only refine the fundamentals; a ticker without them is still valued, and says why.
+        try:
+            reported = _with_retries(lambda: statements.get(ticker, info), retries, backoff)
+        except Exception as e:
+            statements_error = f"{type(e).__name__}: {e}"
+    return {"ticker": ticker, "info": info, "price": price, "statements": reported,
+            "statements_error": statements_error, "stale": stale, "error": None}
+
+
+def iter_fetch(provider, tickers, max_workers=8, calls_per_second=10, retries=2, with_statements=True):
+    """Yield one fetched record per ticker as soon as it completes."""
+    provider = throttled(provider, RateLimiter(calls_per_second))
+    statements = StatementLibrary(provider) if with_statements else None
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Each task runs in a copy of this context, so the active perf tracer sees its fetches.
+        futures = {pool.submit(contextvars.copy_context().run, fetch_ticker, provider, t, retries, 0.5, statements): t
+                   for t in tickers}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {"ticker": futures[future], "info": {}, "price": np.nan, "error": str(e)}
+
+
+def fundamentals_frame(records, ebit_margin, tax_rate):
+    """Fundamentals per record: latest reported statements where available, info estimates otherwise."""
+    f = pd.DataFrame([fundamentals_from_info(r["info"], ebit_margin) for r in records],
+                     index=[r["ticker"].upper() for r in records], dtype=float)
+    reported = [r["statements"] for r in records if r.get("statements") is not None and len(r["statements"])]
+    if reported:
+        # One grouped pass over every company's reported years.
+        summary = company_summary(normalize(pd.concat(reported, ignore_index=True)), tax_rate)
+        latest = summary[list(REPORTED_FIELDS)].rename(columns=REPORTED_FIELDS).reindex(f.index)
+        f = pd.DataFrame(np.where(latest.isna(), f[latest.columns], latest), index=f.index, columns=latest.columns)
+    return f.reset_index(drop=True)
+
+
+def _fundamentals_source(record):
+    if record.get("statements") is not None and len(record["statements"]):
+        return "statements"
+    if record.get("statements_error"):
+        return f"estimate (statements failed: {record['statements_error']})"
+    return "estimate"
+
+
+def value_records(records, revenue_growth, terminal_growth, ebit_margin, tax_rate, discount_rate, forecast_years,
+                  fade_years=0):
+    ok = [r for r in records if r["error"] is None]
+    rows = [{"Ticker": r["ticker"], "Error": r["error"]} for r in records if r["error"] is not None]
+    if ok:
+        f = fundamentals_frame(ok, ebit_margin, tax_rate)
+        # Base-year FCF at the assumed margin, as in pipeline.value_market_data().
+        fcf = free_cash_flow(f["revenue"].to_numpy(float) * ebit_margin / 100, tax_rate, f["dep"].to_numpy(float),
+                             f["capex"].to_numpy(float), f["wc"].to_numpy(float))
+        balance = f["cash"].to_numpy(float), f["debt"].to_numpy(float), f["shares"].to_numpy(float)
+        val = batch_dcf(fcf, revenue_growth, discount_rate, terminal_growth, forecast_years, *balance, fade_years)
+        price = np.array([r["price"] for r in ok], dtype=float)
+        implied = implied_assumption(price, "revenue_growth", fcf, revenue_growth, discount_rate, terminal_growth,
+                                     forecast_years, *balance, fade_years)
+        for i, r in enumerate(ok):
+            rows.append({
+                "Ticker": r["ticker"],
+                "Name": r["info"].get("shortName", "N/A"),
+                "Sector": r["info"].get("sector", "N/A"),
+                "Price": price[i],
+                "Intrinsic Value": val["intrinsic_value"][i],
+                "Upside %": (val["intrinsic_value"][i] - price[i]) / price[i] * 100,
+                "Implied Growth %": implied[i],
+                "EV": val["ev"][i],
+                "Equity Value": val["equity_value"][i],
+                "Fundamentals": _fundamentals_source(r),
+                # Oldest input served from an expired cache entry, NaN when all were fresh.
+                "Data Age (s)": max(r["stale"].values()) if r.get("stale") else np.nan,
+                "Error": None,
+            })
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def bulk_valuation(provider, tickers, assumptions, chunk_size=25, sector_index=None, **fetch_kwargs):
+    """Yield DataFrames of valued rows, chunk by chunk, as fetches complete.
+
+    Fetched infos are also registered in `sector_index` (a peers.SectorIndex) when given.
+    """
+    pending = []
+    for record in iter_fetch(provider, tickers, **fetch_kwargs):
+        if sector_index is not None and record["error"] is None:
+            sector_index.register(record["ticker"], record["info"])
+        pending.append(record)
+        if len(pending) >= chunk_size:
+            yield value_records(pending, **assumptions)
+            pending = []
+    if pending:
+        yield value_records(pending, **assumptions)
@@ -0,0 +1,210 @@
+import numpy as np
+
+# --- Vectorized DCF engine ---
+# All rates are percentages (same units as the app sliders). Every argument may be a
+# scalar or an array; arrays are broadcast against each other so one call can value
+# a whole universe of tickers or a grid of scenarios.
+
+
+def _as_arrays(*values):
+    return np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in values])
+
+
+def free_cash_flow(ebit, tax_rate, dep, capex, wc):
+    """NOPAT + D&A - CapEx - change in working capital."""
+    ebit = np.asarray(ebit, dtype=float)
+    return ebit * (1 - np.asarray(tax_rate, dtype=float) / 100) + dep - capex - wc
+
+
+def gordon_terminal_value(last_fcf, discount_rate, terminal_growth, forecast_years):
+    """Gordon-growth terminal value after the last forecast year, and its present value."""
+    r = np.asarray(discount_rate, dtype=float) / 100
+    tg = np.asarray(terminal_growth, dtype=float) / 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terminal_value = last_fcf * (1 + tg) / (r - tg)
+        return terminal_value, terminal_value / (1 + r) ** forecast_years
+
+
+def batch_dcf(fcf, revenue_growth, discount_rate, terminal_growth, forecast_years, cash, debt, shares,
+              fade_years=0):
+    """Enterprise value, equity value and intrinsic value per share for every input row.
+
+    With fade_years > 0 growth fades linearly from revenue_growth to terminal_growth over
+    that many years after the forecast (see growth_path / multistage_dcf).
+    """
+    if np.any(np.asarray(fade_years) > 0):
+        growth = growth_path(revenue_growth, terminal_growth, forecast_years, fade_years)
+        val = multistage_dcf(fcf, growth, discount_rate, terminal_growth, cash, debt, shares)
+        return {k: val[k] for k in ("pv_fcf", "terminal_value", "pv_terminal", "ev", "equity_value", "intrinsic_value")}
+
+    fcf, g, r, tg, n, cash, debt, shares = _as_arrays(
+        fcf, revenue_growth, discount_rate, terminal_growth, forecast_years, cash, debt, shares)
+    g, r, tg = g / 100, r / 100, tg / 100
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Sum of fcf * q**t for t = 1..n as a closed-form geometric series, so the
+        # cost does not depend on the forecast horizon.
+        q = (1 + g) / (1 + r)
+        series = np.where(np.isclose(q, 1.0), n, q * (1 - q ** n) / (1 - q))
+        pv_fcf = fcf * series
+
+        terminal_value, pv_terminal = gordon_terminal_value(fcf * (1 + g) ** n, r * 100, tg * 100, n)
+
+        ev = pv_fcf + pv_terminal
+        equity_value = ev + cash - debt
+        intrinsic_value = equity_value / shares
+
+    return {
+        "pv_fcf": pv_fcf,
+        "terminal_value": terminal_value,
+        "pv_terminal": pv_terminal,
+        "ev": ev,
+        "equity_value": equity_value,
+        "intrinsic_value": intrinsic_value,
+    }
+
+
+# --- Multi-stage model ---
+# High growth for the forecast years, a linear fade, then Gordon growth. Stages are per-year
+# arrays on the last axis, so every scenario and year is valued in one broadcasted pass.
+
+def growth_path(high_growth, terminal_growth, high_years, fade_years=0):
+    """Per-year growth %: high_growth for high_years, then a linear fade towards terminal_growth.
+
+    Shape (..., max(high_years + fade_years)); years past a row's horizon are NaN.
+    """
+    g, tg, n, f = _as_arrays(high_growth, terminal_growth, high_years, fade_years)
+    years = np.arange(1, int((n + f).max()) + 1)
+    g, tg, n, f = (x[..., None] for x in (g, tg, n, f))
+    fade = g + (tg - g) * (years - n) / (f + 1)
+    return np.where(years <= n, g, np.where(years <= n + f, fade, np.nan))
+
+
+def multistage_dcf(base, growth, discount_rate, terminal_growth, cash, debt, shares,
+                   margin=None, tax_rate=0.0, reinvestment=0.0):
+    """DCF over explicit per-year growth (and optionally margin and reinvestment) vectors.
+
+    `growth` has shape (..., years), e.g. from growth_path(); NaN years are past the horizon.
+    Without `margin`, `base` is the latest FCF and compounds at growth. With it, `base` is
+    revenue and FCF_t = revenue_t * margin_t * (1 - tax) * (1 - reinvestment_t). Arguments with
+    growth's full shape are per-year; lower-dimensional ones are per-scenario, broadcast over the years.
+    """
+    growth = np.asarray(growth, dtype=float)
+
+    def per_year(x):
+        x = np.asarray(x, dtype=float)
+        return x if x.ndim == growth.ndim else x[..., None]
+
+    flows = per_year(base) * np.cumprod(1 + np.nan_to_num(growth) / 100, axis=-1)
+    if margin is not None:
+        flows = flows * (per_year(margin) / 100) * (1 - per_year(tax_rate) / 100) * (1 - per_year(reinvestment) / 100)
+    return discount_flows(np.where(np.isfinite(growth), flows, np.nan), discount_rate, terminal_growth,
+                          cash, debt, shares)
+
+
+def discount_flows(flows, discount_rate, terminal_growth, cash, debt, shares):
+    """Value explicit per-year cash flows of shape (..., years); NaN years are past the horizon.
+
+    The terminal value grows the last in-horizon flow at terminal_growth.
+    """
+    flows = np.asarray(flows, dtype=float)
+    years = np.arange(1, flows.shape[-1] + 1)
+    inside = np.isfinite(flows)
+    flows = np.where(inside, flows, 0.0)
+    n = inside.sum(axis=-1)
+    last = np.take_along_axis(flows, np.maximum(n - 1, 0)[..., None], axis=-1)[..., 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discounted = flows / (1 + np.asarray(discount_rate, dtype=float)[..., None] / 100) ** years
+        pv_fcf = discounted.sum(axis=-1)
+        terminal_value, pv_terminal = gordon_terminal_value(last, discount_rate, terminal_growth, n)
+        ev = pv_fcf + pv_terminal
+        equity_value = ev + np.asarray(cash, dtype=float) - debt
+        intrinsic_value = equity_value / np.asarray(shares, dtype=float)
+
+    return {
+        "cash_flows": flows,
+        "discounted": discounted,
+        "pv_fcf": pv_fcf,
+        "terminal_value": terminal_value,
+        "pv_terminal": pv_terminal,
+        "ev": ev,
+        "equity_value": equity_value,
+        "intrinsic_value": intrinsic_value,
+    }
+
+
+# --- Reverse DCF ---
+# Solve for the assumption that makes intrinsic value equal the market price, for every row
+# at once: Newton steps (numerical derivative) kept inside a bracket that bisection shrinks.
+
+SOLVE_BOUNDS = {
+    "revenue_growth": (-50.0, 100.0),
+    "discount_rate": (0.0, 100.0),
+    "terminal_growth": (-20.0, 30.0),
+}
+
+
+def implied_assumption(price, solve_for, fcf, revenue_growth, discount_rate, terminal_growth, forecast_years,
+                       cash, debt, shares, fade_years=0, bounds=None, tol=1e-6, max_iter=60):
+    """Value of `solve_for` ("revenue_growth", "discount_rate" or "terminal_growth") at which
+    batch_dcf's intrinsic value equals `price`, per row. NaN where no root lies within bounds.
+    """
+    inputs = dict(price=price, fcf=fcf, revenue_growth=revenue_growth, discount_rate=discount_rate,
+                  terminal_growth=terminal_growth, forecast_years=forecast_years, cash=cash, debt=debt,
+                  shares=shares, fade_years=fade_years)
+    shape = np.broadcast(*[np.asarray(v) for v in inputs.values()]).shape
+    rows = {k: v.ravel() for k, v in zip(inputs, _as_arrays(*inputs.values()))}
+    price = rows.pop("price")
+    lo, hi = (np.full(price.shape, b, dtype=float) for b in (bounds or SOLVE_BOUNDS[solve_for]))
+    # Keep WACC above terminal growth so the Gordon terminal value stays finite.
+    if solve_for == "discount_rate":
+        lo = np.maximum(lo, rows["terminal_growth"] + 1e-6)
+    elif solve_for == "terminal_growth":
+        hi = np.minimum(hi, rows["discount_rate"] - 1e-6)
+
+    def gap(x, idx):
+        args = {k: v[idx] for k, v in rows.items()}
+        args[solve_for] = x
+        return batch_dcf(**args)["intrinsic_value"] - price[idx]
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        every = np.arange(price.size)
+        f_lo, f_hi = gap(lo, every), gap(hi, every)
+        found = np.isfinite(f_lo) & np.isfinite(f_hi) & (np.sign(f_lo) != np.sign(f_hi)) & (lo < hi)
+        x = (lo + hi) / 2
+        # Only rows that have not converged yet are evaluated on each pass.
+        idx = np.flatnonzero(found)
+        for _ in range(max_iter):
+            if not idx.size:
+                break
+            xi = x[idx]
+            fx = gap(xi, idx)
+            same = np.sign(fx) == np.sign(f_lo[idx])
+            lo[idx] = np.where(same, xi, lo[idx])
+            f_lo[idx] = np.where(same, fx, f_lo[idx])
+            hi[idx] = np.where(same, hi[idx], xi)
+
+            h = np.maximum(np.abs(xi), 1.0) * 1e-6
+            step = xi - fx * h / (gap(xi + h, idx) - fx)
+            inside = np.isfinite(step) & (step > lo[idx]) & (step < hi[idx])
+            x[idx] = np.where(fx == 0, xi, np.where(inside, step, (lo[idx] + hi[idx]) / 2))
+            done = (fx == 0) | (hi[idx] - lo[idx] <= tol) | (inside & (np.abs(step - xi) <= tol))
+            idx = idx[~done]
+
+    return np.where(found, x, np.nan).reshape(shape)
+
+
+def sensitivity_grid(fcf, discount_rates, terminal_growths, forecast_years, cash, debt, shares,
+                     revenue_growth=None, revenue_growths=None, fade_years=0):
+    """Intrinsic value over WACC x terminal growth (x revenue growth) in one broadcasted call.
+
+    Returns shape (len(discount_rates), len(terminal_growths)), or
+    (len(revenue_growths), len(discount_rates), len(terminal_growths)) when revenue_growths is given.
+    Cells where WACC <= terminal growth have no finite terminal value and are NaN.
+    """
+    r = np.asarray(discount_rates, dtype=float)[:, None]
+    tg = np.asarray(terminal_growths, dtype=float)[None, :]
+    g = revenue_growth if revenue_growths is None else np.asarray(revenue_growths, dtype=float)[:, None, None]
+    iv = batch_dcf(fcf, g, r, tg, forecast_years, cash, debt, shares, fade_years)["intrinsic_value"]
+    return np.where(r > tg, iv, np.nan)
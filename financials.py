@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+from dcf import batch_dcf, free_cash_flow
+
+# --- Financial statement ingestion ---
+# Uploads (CSV, XLSX, Parquet or Arrow/Feather) use the Year,Revenue,EBIT,CapEx,Dep,ΔWC,Cash,
+# Debt,Shares template, optionally with a Ticker column so one file can hold thousands of
+# companies x years. Everything below works on the whole long table at once (grouped by
+# Ticker), never company by company.
+
+COLUMNS = ["Year", "Revenue", "EBIT", "CapEx", "Dep", "ΔWC", "Cash", "Debt", "Shares"]
+DEFAULT_TICKER = "UPLOAD"
+
+# Rows parsed per chunk by the streaming readers.
+CHUNK_ROWS = 100_000
+
+
+def normalize(df):
+    """Validate the template columns and return a float table sorted by Ticker, Year."""
+    missing = [c for c in COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Uploaded financials are missing columns: {', '.join(missing)}")
+    out = df[COLUMNS].apply(pd.to_numeric, errors="coerce").astype(float)
+    out.insert(0, "Ticker", df["Ticker"].astype(str).str.strip().str.upper() if "Ticker" in df.columns else DEFAULT_TICKER)
+    return out.dropna(subset=["Year", "Revenue"]).sort_values(["Ticker", "Year"], kind="stable").reset_index(drop=True)
+
+
+# --- Streaming readers ---
+def _xlsx_chunks(file, chunksize):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
+def _parquet_chunks(file, chunksize):
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(file, memory_map=isinstance(file, str))
+    for batch in source.iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def _arrow_chunks(file):
+    import pyarrow as pa
+
+    source = pa.memory_map(file) if isinstance(file, str) else file
+    reader = pa.ipc.open_file(source)
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i).to_pandas()
+
+
+def iter_chunks(file, name=None, chunksize=CHUNK_ROWS):
+    """Yield normalized chunks of an upload without loading the whole file.
+
+    XLSX goes through openpyxl's read-only row iterator, Parquet through row-batch iteration
+    and Arrow/Feather record batches (memory-mapped when given a path). The column check
+    runs on the first chunk.
+    """
+    name = (name or getattr(file, "name", str(file))).lower()
+    if name.endswith(".xlsx"):
+        raw = _xlsx_chunks(file, chunksize)
+    elif name.endswith(".parquet"):
+        raw = _parquet_chunks(file, chunksize)
+    elif name.endswith((".arrow", ".feather")):
+        raw = _arrow_chunks(file)
+    else:
+        raw = pd.read_csv(file, chunksize=chunksize)
+    for chunk in raw:
+        yield normalize(chunk)
+
+
+def stream_summary(file, name=None, tax_rate=25.0, chunksize=CHUNK_ROWS):
+    """company_summary() of an upload, computed chunk by chunk; memory scales with companies, not rows."""
+    merged = None
+    for chunk in iter_chunks(file, name, chunksize):
+        part = _partials(add_ratios(chunk, tax_rate))
+        merged = part if merged is None else _combine([merged, part])
+    if merged is None:
+        raise ValueError("Uploaded financials are empty")
+    return _finalize(merged)
+
+
+def stream_company(file, ticker, name=None, chunksize=CHUNK_ROWS):
+    """Only `ticker`'s rows. Failing an exact match, rows without a Ticker column or naming the
+    symbol without its exchange suffix ("TCS" for "TCS.NS"); otherwise none."""
+    wanted = ticker.strip().upper()
+    exact, loose = [], []
+    for chunk in iter_chunks(file, name, chunksize):
+        exact.append(chunk[chunk["Ticker"] == wanted])
+        loose.append(chunk[chunk["Ticker"].isin([DEFAULT_TICKER, wanted.split(".")[0]])])
+    rows = pd.concat(exact, ignore_index=True)
+    return rows if not rows.empty else pd.concat(loose, ignore_index=True)
+
+
+def add_ratios(df, tax_rate):
+    """Per-row margin, YoY growth, NOPAT, FCF and reinvestment rate."""
+    out = df.copy()
+    prev_revenue = out.groupby("Ticker")["Revenue"].shift(1)
+    out["Revenue Growth %"] = (out["Revenue"] / prev_revenue - 1) * 100
+    out["EBIT Margin %"] = out["EBIT"] / out["Revenue"] * 100
+    out["NOPAT"] = out["EBIT"] * (1 - tax_rate / 100)
+    out["FCF"] = free_cash_flow(out["EBIT"].to_numpy(), tax_rate, out["Dep"].to_numpy(),
+                                out["CapEx"].to_numpy(), out["ΔWC"].to_numpy())
+    out["Reinvestment Rate %"] = (out["CapEx"] - out["Dep"] + out["ΔWC"]) / out["NOPAT"] * 100
+    return out
+
+
+# --- Per-company summary ---
+# Built from additive partial aggregates so the same code summarizes an in-memory table or a
+# stream of chunks (a company's years may straddle chunk boundaries).
+
+def _partials(rows):
+    """Mergeable per-company aggregates for one chunk of add_ratios() output."""
+    # Years are centred before squaring to keep the slope sums well conditioned.
+    x, margin, reinv = rows["Year"] - 2000, rows["EBIT Margin %"], rows["Reinvestment Rate %"]
+    has_margin = margin.notna()
+    frame = pd.DataFrame({
+        "Ticker": rows["Ticker"],
+        "n": has_margin.astype(float),
+        "sx": x.where(has_margin, 0.0),
+        "sy": margin.fillna(0.0),
+        "sxy": (x * margin).fillna(0.0),
+        "sxx": (x * x).where(has_margin, 0.0),
+        "reinv_sum": reinv.fillna(0.0),
+        "reinv_n": reinv.notna().astype(float),
+        "Years": 1.0,
+    })
+    g = rows.groupby("Ticker", sort=False)
+    out = frame.groupby("Ticker", sort=False).sum()
+    out = out.join(g[["Year", "Revenue"]].first().add_prefix("first_"))
+    return out.join(g[COLUMNS + ["FCF"]].last().add_prefix("last_"))
+
+
+def _combine(parts):
+    both = pd.concat(parts)
+    if len(parts) == 1 or not both.index.duplicated().any():
+        return both
+    sums = both[["n", "sx", "sy", "sxy", "sxx", "reinv_sum", "reinv_n", "Years"]].groupby(level=0, sort=False).sum()
+    first_cols = [c for c in both.columns if c.startswith("first_")]
+    last_cols = [c for c in both.columns if c.startswith("last_")]
+    first = both[first_cols].sort_values("first_Year", kind="stable").groupby(level=0, sort=False).head(1)
+    last = both[last_cols].sort_values("last_Year", kind="stable").groupby(level=0, sort=False).tail(1)
+    return sums.join(first).join(last)
+
+
+def _finalize(p):
+    out = p[[f"last_{c}" for c in COLUMNS]].rename(columns=lambda c: c[len("last_"):])
+    out.index.name = "Ticker"
+    span = (p["last_Year"] - p["first_Year"]).where(lambda s: s > 0)
+    denom = p["n"] * p["sxx"] - p["sx"] ** 2
+    out["Years"] = p["Years"].astype(int)
+    out["Revenue CAGR %"] = ((p["last_Revenue"] / p["first_Revenue"]) ** (1 / span) - 1) * 100
+    out["Avg EBIT Margin %"] = p["sy"] / p["n"].where(p["n"] > 0)
+    out["EBIT Margin Trend (pp/yr)"] = (p["n"] * p["sxy"] - p["sx"] * p["sy"]) / denom.where(denom.abs() > 1e-9)
+    out["Avg Reinvestment Rate %"] = p["reinv_sum"] / p["reinv_n"].where(p["reinv_n"] > 0)
+    out["Latest FCF"] = p["last_FCF"]
+    return out
+
+
+def company_summary(df, tax_rate=25.0):
+    """One row per company: latest-year fundamentals plus multi-year growth, margin and reinvestment stats."""
+    return _finalize(_partials(add_ratios(df, tax_rate)))
+
+
+def value_companies(summary, tax_rate, revenue_growth, discount_rate, terminal_growth, forecast_years,
+                    use_cagr=True, fade_years=0, ebit_margin=None):
+    """Batch DCF across every company in a company_summary() table.
+
+    With `ebit_margin` the base FCF uses latest revenue at that margin, as pipeline.value_market_data()
+    does; without it, the reported EBIT.
+    """
+    growth = summary["Revenue CAGR %"].fillna(revenue_growth).to_numpy() if use_cagr else revenue_growth
+    ebit = summary["EBIT"].to_numpy() if ebit_margin is None else summary["Revenue"].to_numpy() * ebit_margin / 100
+    fcf = free_cash_flow(ebit, tax_rate, summary["Dep"].to_numpy(),
+                         summary["CapEx"].to_numpy(), summary["ΔWC"].to_numpy())
+    val = batch_dcf(fcf, growth, discount_rate, terminal_growth, forecast_years,
+                    summary["Cash"].to_numpy(), summary["Debt"].to_numpy(), summary["Shares"].to_numpy(), fade_years)
+    out = summary.copy()
+    out["Growth Used %"] = np.broadcast_to(growth, len(out))
+    out["EV"] = val["ev"]
+    out["Equity Value"] = val["equity_value"]
+    out["Intrinsic Value"] = val["intrinsic_value"]
+    return out
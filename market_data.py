@@ -0,0 +1,615 @@
+import contextvars
+import fnmatch
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import perf
+
+# --- Market data providers ---
+# A provider exposes info(ticker) -> dict and history(ticker, period=None, start=None, end=None)
+# -> OHLCV DataFrame. CachedProvider wraps any provider with an in-memory LRU and an on-disk store.
+
+CACHE_DIR = os.environ.get("ALPHASTACK_CACHE_DIR", ".alphastack_cache")
+
+# Seconds an entry stays fresh, per endpoint.
+DEFAULT_TTLS = {
+    "info": 6 * 60 * 60,
+    "history": 15 * 60,
+}
+
+# Opt-in stale-while-revalidate window for interactive use: seconds past its TTL an entry may
+# still be served while a background refresh runs. Batch runs (CLI, scripts) keep the default
+# of 0 and always wait for fresh data. Older entries, and other endpoints, are refreshed first.
+INTERACTIVE_MAX_STALE = {
+    "info": 7 * 24 * 60 * 60,
+    "history": 7 * 24 * 60 * 60,
+}
+
+# Relative Close difference on a re-fetched overlap bar beyond which cached history is treated
+# as back-adjusted (split or dividend) and fetched in full rather than extended.
+ADJUSTMENT_TOLERANCE = 1e-4
+
+PERIOD_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183,
+    "1y": 366, "2y": 731, "5y": 1827, "10y": 3653, "ytd": None, "max": None,
+}
+
+
+class YFinanceProvider:
+    # yfinance is imported on first use: it is slow to import and cached sessions never need it.
+    def _ticker(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker)
+
+    def info(self, ticker):
+        return self._ticker(ticker).info
+
+    def history(self, ticker, period=None, start=None, end=None):
+        if start is not None:
+            return self._ticker(ticker).history(start=start, end=end)
+        return self._ticker(ticker).history(period=period or "1mo")
+
+    def statements(self, ticker):
+        """Annual cash flow, income and balance sheet statements (line items x fiscal year ends)."""
+        t = self._ticker(ticker)
+        return {"cashflow": t.cashflow, "financials": t.financials, "balance_sheet": t.balance_sheet}
+
+
+class FakeProvider:
+    """Deterministic offline stand-in for yfinance, seeded by the ticker symbol."""
+
+    def __init__(self, start="1990-01-01", end=None):
+        self.start = pd.Timestamp(start)
+        self.end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+        self.calls = {"info": 0, "history": 0, "statements": 0}
+
+    def _rng(self, ticker):
+        return np.random.default_rng(zlib.crc32(ticker.encode()))
+
+    def info(self, ticker):
+        self.calls["info"] += 1
+        return self._info(ticker)
+
+    def _info(self, ticker):
+        rng = self._rng(ticker)
+        revenue = float(rng.uniform(1e9, 5e12))
+        shares = float(rng.uniform(1e7, 5e9))
+        ebitda = revenue * float(rng.uniform(0.08, 0.35))
+        return {
+            "symbol": ticker,
+            "shortName": f"{ticker} Ltd",
+            "sector": ["Technology", "Financial Services", "Energy", "Healthcare"][rng.integers(4)],
+            "industry": ["Software", "Banks", "Oil & Gas", "Pharmaceuticals"][rng.integers(4)],
+            "marketCap": revenue * float(rng.uniform(0.5, 8)),
+            "trailingPE": float(rng.uniform(5, 60)),
+            "dividendYield": float(rng.uniform(0, 0.05)),
+            "totalRevenue": revenue,
+            "totalCash": revenue * float(rng.uniform(0.02, 0.3)),
+            "totalDebt": revenue * float(rng.uniform(0, 0.5)),
+            "sharesOutstanding": shares,
+            "ebitda": ebitda,
+            "enterpriseToEbitda": float(rng.uniform(4, 40)),
+            "priceToBook": float(rng.uniform(0.5, 15)),
+            "currentPrice": float(rng.uniform(50, 5000)),
+        }
+
+    def statements(self, ticker, years=4):
+        # Indian-style fiscal years ending 31 March, laid out like yfinance (rows = line items).
+        self.calls["statements"] += 1
+        info = self._info(ticker)
+        rng = self._rng(ticker + "|statements")
+        last = pd.Timestamp(year=self.end.year - (self.end.month < 7), month=3, day=31)
+        dates = pd.DatetimeIndex([last - pd.DateOffset(years=k) for k in range(years)])
+        revenue = info["totalRevenue"] / np.cumprod(np.r_[1.0, 1 + rng.uniform(0.0, 0.2, years - 1)])
+        ebit = revenue * rng.uniform(0.08, 0.3)
+        dep = revenue * rng.uniform(0.02, 0.06, years)
+        capex = revenue * rng.uniform(0.03, 0.1, years)
+        wc = revenue * rng.uniform(-0.02, 0.03, years)
+        return {
+            "cashflow": pd.DataFrame([-capex, dep, -wc], columns=dates,
+                                     index=["Capital Expenditure", "Depreciation And Amortization",
+                                            "Change In Working Capital"]),
+            "financials": pd.DataFrame([revenue, ebit], columns=dates, index=["Total Revenue", "EBIT"]),
+            "balance_sheet": pd.DataFrame(
+                [np.full(years, info["totalCash"]), np.full(years, info["totalDebt"]),
+                 np.full(years, info["sharesOutstanding"])],
+                columns=dates, index=["Cash And Cash Equivalents", "Total Debt", "Ordinary Shares Number"]),
+        }
+
+    def history(self, ticker, period=None, start=None, end=None):
+        self.calls["history"] += 1
+        index = pd.bdate_range(self.start, self.end, name="Date")
+        # One row of shocks per bar, so a later end date only appends bars (like real history).
+        z = self._rng(ticker).standard_normal((len(index), 5))
+        close = 100 * np.exp(np.cumsum(0.0003 + 0.02 * z[:, 0]))
+        open_ = close * (1 + 0.005 * z[:, 1])
+        high = np.maximum(open_, close) * (1 + np.abs(0.01 * z[:, 2]))
+        low = np.minimum(open_, close) * (1 - np.abs(0.01 * z[:, 3]))
+        volume = np.round(np.exp(13 + 0.8 * z[:, 4]))
+        df = pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+        return slice_history(df, period=period, start=start, end=end)
+
+
+def _as_index_time(value, index):
+    # yfinance returns exchange-local, tz-aware indexes; compare like with like.
+    ts = pd.Timestamp(value)
+    if getattr(index, "tz", None) is not None and ts.tzinfo is None:
+        return ts.tz_localize(index.tz)
+    return ts
+
+
+def slice_history(df, period=None, start=None, end=None):
+    """Cut an OHLCV frame down to a yfinance-style period or a [start, end) date range."""
+    if start is not None or end is not None:
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= df.index >= _as_index_time(start, df.index)
+        if end is not None:
+            mask &= df.index < _as_index_time(end, df.index)
+        return df[mask]
+    if df.empty or period in (None, "max"):
+        return df
+    last = df.index[-1]
+    if period == "ytd":
+        return df[df.index >= pd.Timestamp(year=last.year, month=1, day=1)]
+    if period == "1d":
+        return df.iloc[-1:]
+    return df[df.index > last - pd.Timedelta(days=PERIOD_DAYS[period])]
+
+
+# --- Stores ---
+# Every store maps a string key to (stored_at, value). Several processes or replicas may share
+# one: a SQLite file (plus Parquet frames) on a shared volume, or a Redis-compatible server.
+
+class SQLiteStore:
+    """Pickled values keyed by string, with the time they were stored.
+
+    Safe to share between processes: SQLite's file locks serialize writers and readers wait up
+    to `timeout` seconds for a lock. journal_mode="WAL" lets readers and a writer overlap when
+    every process is on one host; keep the default rollback journal on network file systems.
+    """
+
+    def __init__(self, path, timeout=30, journal_mode=None):
+        self.path = path
+        self.timeout = timeout
+        self.journal_mode = journal_mode
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL, value BLOB)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            if self.journal_mode:
+                conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute("SELECT stored_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], pickle.loads(row[1])
+
+    def set(self, key, value, stored_at=None, max_age=None):
+        """Store `value`; with max_age, also prune entries under the same key prefix (up to the last "|")
+        stored more than max_age seconds ago."""
+        stored_at = time.time() if stored_at is None else stored_at
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                         (key, stored_at, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+        if max_age is not None:
+            self.prune(key.rsplit("|", 1)[0] + "|", stored_at - max_age)
+
+    def prune(self, prefix, before):
+        """Delete entries whose key starts with `prefix` stored before `before`; returns their keys."""
+        with self._conn() as conn:
+            keys = [k for (k,) in conn.execute("SELECT key FROM cache WHERE substr(key, 1, ?) = ? AND stored_at < ?",
+                                               (len(prefix), prefix, before))]
+            conn.executemany("DELETE FROM cache WHERE key = ?", [(k,) for k in keys])
+        return keys
+
+    def keys(self, prefix=""):
+        rows = self._conn().execute("SELECT key FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        return [k for (k,) in rows]
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache")
+
+
+class ParquetStore(SQLiteStore):
+    """SQLiteStore that keeps DataFrame values (price histories, statements) as Parquet files.
+
+    SQLite holds the key, timestamp and file name; frames are read back memory-mapped, so a
+    cached history loads without re-parsing. Other values (info dicts) stay pickled in SQLite.
+    """
+
+    def __init__(self, path, frames_dir=None, **sqlite_kwargs):
+        super().__init__(path, **sqlite_kwargs)
+        self.frames_dir = frames_dir or os.path.join(os.path.dirname(os.path.abspath(path)), "frames")
+        os.makedirs(self.frames_dir, exist_ok=True)
+
+    def _frame_path(self, key):
+        return os.path.join(self.frames_dir, hashlib.sha1(key.encode()).hexdigest() + ".parquet")
+
+    def get(self, key):
+        entry = super().get(key)
+        if entry is None or not isinstance(entry[1], dict) or "__parquet__" not in entry[1]:
+            return entry
+        # Only the file name is resolved, so replicas may mount the shared volume at different paths.
+        try:
+            return entry[0], read_parquet(os.path.join(self.frames_dir, os.path.basename(entry[1]["__parquet__"])))
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value, stored_at=None, max_age=None):
+        if isinstance(value, pd.DataFrame):
+            path = self._frame_path(key)
+            write_parquet(value, path)
+            value = {"__parquet__": os.path.basename(path)}
+        super().set(key, value, stored_at, max_age)
+
+    def prune(self, prefix, before):
+        keys = super().prune(prefix, before)
+        for key in keys:
+            path = self._frame_path(key)
+            if os.path.exists(path):
+                os.remove(path)
+        return keys
+
+    def delete(self, key):
+        path = self._frame_path(key)
+        if os.path.exists(path):
+            os.remove(path)
+        super().delete(key)
+
+    def clear(self):
+        for name in os.listdir(self.frames_dir):
+            os.remove(os.path.join(self.frames_dir, name))
+        super().clear()
+
+
+class RedisStore:
+    """Pickled (stored_at, value) pairs in a Redis-compatible server shared by every replica.
+
+    `client` is a redis.Redis (see from_url) or anything with the same get/set/delete/scan_iter
+    methods, such as LocalRedis. Entries expire server-side after `max_age` seconds (per store, or
+    per set() call), if given.
+    """
+
+    def __init__(self, client, prefix="alphastack:", max_age=None):
+        self.client = client
+        self.prefix = prefix
+        self.max_age = max_age
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, stored_at=None, max_age=None):
+        stored_at = time.time() if stored_at is None else stored_at
+        max_age = self.max_age if max_age is None else max_age
+        self.client.set(self.prefix + key, pickle.dumps((stored_at, value), protocol=pickle.HIGHEST_PROTOCOL),
+                        ex=None if max_age is None else max(1, int(max_age)))
+
+    def keys(self, prefix=""):
+        names = self.client.scan_iter(match=self.prefix + prefix + "*")
+        return [(n.decode() if isinstance(n, bytes) else n)[len(self.prefix):] for n in names]
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for name in list(self.client.scan_iter(match=self.prefix + "*")):
+            self.client.delete(name)
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of the redis client RedisStore uses (tests, demos)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            item = self._data.get(name)
+            if item is not None and item[1] is not None and item[1] <= time.time():
+                del self._data[name]
+                item = None
+        return None if item is None else item[0]
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (value, None if ex is None else time.time() + ex)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(n, None) is not None for n in names)
+
+    def scan_iter(self, match="*"):
+        with self._lock:
+            names = list(self._data)
+        return (n for n in names if fnmatch.fnmatchcase(n, match))
+
+
+def default_store(cache_dir=CACHE_DIR):
+    """The shared cache: Redis when ALPHASTACK_REDIS_URL is set, else SQLite + Parquet under cache_dir.
+
+    Point ALPHASTACK_CACHE_DIR at a shared volume (or set ALPHASTACK_REDIS_URL) so every replica
+    reuses the others' fetches. ALPHASTACK_SQLITE_JOURNAL=WAL suits replicas on a single host.
+    """
+    url = os.environ.get("ALPHASTACK_REDIS_URL")
+    if url:
+        return RedisStore.from_url(url)
+    return ParquetStore(os.path.join(cache_dir, "market_data.sqlite"),
+                        journal_mode=os.environ.get("ALPHASTACK_SQLITE_JOURNAL"))
+
+
+def write_parquet(df, path):
+    # Write-then-rename so concurrent readers never see a half-written file.
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_parquet(tmp)
+    os.replace(tmp, path)
+
+
+def read_parquet(path, columns=None):
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+# --- Request coalescing ---
+class SingleFlight:
+    """Concurrent calls with the same key share one execution and its result (or exception)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def do(self, key, fn):
+        """Run fn() unless a call for `key` is already in flight, in which case wait for its outcome.
+
+        Returns (value, shared) where shared is True for callers that piggybacked.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return future.result(), False
+
+
+# One per process, so every session's provider shares in-flight upstream fetches.
+FLIGHTS = SingleFlight()
+
+
+# --- Caching layer ---
+# Background refreshes of stale entries. Non-daemon, so a CLI run still finishes its refreshes.
+REVALIDATOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="alphastack-revalidate")
+
+_stale_served = contextvars.ContextVar("alphastack_stale_served", default=None)
+
+
+@contextmanager
+def track_staleness():
+    """Collect {endpoint: age in seconds} of every stale entry served inside the block."""
+    served = {}
+    token = _stale_served.set(served)
+    try:
+        yield served
+    finally:
+        _stale_served.reset(token)
+
+
+class CachedProvider:
+    def __init__(self, provider, store=None, ttls=None, max_items=256, flights=FLIGHTS, max_stale=None):
+        self.provider = provider
+        self.store = store
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_stale = dict(max_stale or {})
+        self.max_items = max_items
+        self.flights = flights
+        # Wrappers may replace .provider (see bulk.throttled); flights stay keyed by the real upstream.
+        self.upstream = type(provider).__name__
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "delta_updates": 0, "coalesced": 0,
+                      "stale_hits": 0, "readjusted": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._revalidating = set()
+
+    def info(self, ticker):
+        return self._get(f"{ticker}|info", "info", lambda: self.provider.info(ticker))
+
+    def history(self, ticker, period=None, start=None, end=None):
+        key = f"{ticker}|history|{period}|{start}|{end}"
+
+        def fetch():
+            return self.provider.history(ticker, period=period, start=start, end=end)
+
+        # Open-ended ranges only grow at the end, so an expired copy is refreshed with its missing tail.
+        open_ended = end is None and (period == "max" or start is not None)
+        return self._get(key, "history", fetch, (lambda old: self._extend(ticker, old, fetch)) if open_ended else None)
+
+    def statements(self, ticker):
+        # Not TTL-cached here: statements.StatementLibrary keeps them until the next fiscal period is due.
+        def fetch():
+            with perf.stage("fetch.network.statements"):
+                value = self.provider.statements(ticker)
+            perf.count("network_calls")
+            return value
+
+        return self._coalesce(f"{ticker}|statements", fetch)[0]
+
+    def _coalesce(self, key, fetch):
+        # Keyed by upstream type too, so providers over different sources never share results.
+        value, shared = self.flights.do((self.upstream, key), fetch)
+        if shared:
+            self.stats["coalesced"] += 1
+            perf.count("fetch.coalesced")
+        return value, shared
+
+    def _extend(self, ticker, old, fetch):
+        """Fetch only the bars from the last complete cached one on and append them to `old`.
+
+        yfinance back-adjusts the whole series after splits and dividends, so when the re-fetched
+        overlap bar no longer matches the cached one the full history is fetched instead.
+        """
+        if not isinstance(old, pd.DataFrame) or len(old) < 2:
+            return fetch()
+        anchor = old.index[-2]
+        tail = self.provider.history(ticker, start=anchor.strftime("%Y-%m-%d"))
+        self.stats["delta_updates"] += 1
+        perf.count("cache.delta_updates")
+        if tail is None or tail.empty:
+            return old
+        fresh = tail["Close"].get(anchor)
+        if fresh is None or not np.isclose(fresh, old["Close"].iloc[-2], rtol=ADJUSTMENT_TOLERANCE, atol=0.0):
+            self.stats["readjusted"] += 1
+            perf.count("cache.readjusted")
+            return fetch()
+        # The last cached bar may have been a partial (intraday) one; the re-fetched copy replaces it.
+        return pd.concat([old[old.index < tail.index[0]], tail])
+
+    def _get(self, key, endpoint, fetch, update=None):
+        ttl = self.ttls[endpoint]
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                perf.count("cache.memory_hits")
+                return entry[1]
+        stale = entry
+
+        if self.store is not None:
+            with perf.stage("fetch.disk_cache"):
+                entry = self.store.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                self._remember(key, entry)
+                self.stats["disk_hits"] += 1
+                perf.count("cache.disk_hits")
+                return entry[1]
+            stale = entry if entry is not None else stale
+
+        def refresh():
+            # A flight that finished between our cache check and now has already stored the value.
+            with self._lock:
+                entry = self._memory.get(key)
+            if entry is not None and time.time() - entry[0] < ttl:
+                return entry[1]
+            with perf.stage(f"fetch.network.{endpoint}"):
+                value = update(stale[1]) if update is not None and stale is not None else fetch()
+            entry = (time.time(), value)
+            self.stats["misses"] += 1
+            perf.count("cache.misses")
+            perf.count("network_calls")
+            self._remember(key, entry)
+            if self.store is not None:
+                self.store.set(key, value, stored_at=entry[0])
+            return value
+
+        if stale is not None and now - stale[0] < ttl + self.max_stale.get(endpoint, 0):
+            self._serve_stale(key, endpoint, stale, now, refresh)
+            return stale[1]
+        return self._refresh(key, refresh)
+
+    def _refresh(self, key, refresh):
+        value, shared = self._coalesce(key, refresh)
+        if shared:
+            self._remember(key, (time.time(), value))
+        return value
+
+    def _serve_stale(self, key, endpoint, stale, now, refresh):
+        """Note the stale entry's age and refresh it on REVALIDATOR unless a refresh is already queued."""
+        self.stats["stale_hits"] += 1
+        perf.count("cache.stale_hits")
+        served = _stale_served.get()
+        if served is not None:
+            served[endpoint] = max(now - stale[0], served.get(endpoint, 0.0))
+        with self._lock:
+            # Keep the stale copy in memory so repeat reads skip the disk, unless a refresh just landed.
+            current = self._memory.get(key)
+            if current is None or current[0] < stale[0]:
+                self._memory[key] = stale
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def revalidate():
+            try:
+                self._refresh(key, refresh)
+            except Exception:
+                pass  # The stale copy is served until a later request's refresh succeeds.
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        REVALIDATOR.submit(revalidate)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+
+# --- Price history ---
+class HistoryManager:
+    """Fetches one maximal OHLCV range per ticker and serves every window as a slice of it."""
+
+    def __init__(self, provider, period="max"):
+        self.provider = provider
+        self.period = period
+
+    def full(self, ticker):
+        return self.provider.history(ticker, period=self.period)
+
+    def window(self, ticker, period=None, start=None, end=None):
+        return slice_history(self.full(ticker), period=period, start=start, end=end)
+
+    def last_close(self, ticker):
+        return float(self.full(ticker)["Close"].iloc[-1])
+
+
+def default_provider(cache_dir=CACHE_DIR, max_stale=None):
+    # ALPHASTACK_OFFLINE=1 swaps yfinance for the synthetic FakeProvider (demos, CI, benchmarks).
+    upstream = FakeProvider() if os.environ.get("ALPHASTACK_OFFLINE") else YFinanceProvider()
+    return CachedProvider(upstream, default_store(cache_dir), max_stale=max_stale)
@@ -0,0 +1,102 @@
+import numpy as np
+
+from dcf import batch_dcf, free_cash_flow
+
+# --- Monte Carlo DCF ---
+# Samples the slider assumptions from per-variable distributions, correlated through a
+# Gaussian copula, and values every path with batch_dcf. Paths are evaluated in chunks so
+# peak memory stays flat however many paths are requested. All rates are percentages.
+
+VARIABLES = ("revenue_growth", "ebit_margin", "tax_rate", "discount_rate", "terminal_growth")
+
+# Spread (normal std) used by default_distributions(), in percentage points.
+DEFAULT_SPREADS = {
+    "revenue_growth": 3.0,
+    "ebit_margin": 3.0,
+    "tax_rate": 2.0,
+    "discount_rate": 1.5,
+    "terminal_growth": 0.75,
+}
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+def default_distributions(assumptions, scale=1.0):
+    return {v: {"dist": "normal", "mean": assumptions[v], "std": DEFAULT_SPREADS[v] * scale} for v in VARIABLES}
+
+
+def correlation_matrix(pairs):
+    """Build a VARIABLES correlation matrix from {(var_a, var_b): rho}."""
+    corr = np.eye(len(VARIABLES))
+    for (a, b), rho in pairs.items():
+        i, j = VARIABLES.index(a), VARIABLES.index(b)
+        corr[i, j] = corr[j, i] = rho
+    return corr
+
+
+def _norm_cdf(z):
+    # Abramowitz & Stegun 7.1.26 erf approximation (|error| < 1.5e-7), vectorized.
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def _from_normal(z, spec):
+    dist = spec.get("dist", "normal")
+    if dist == "normal":
+        x = spec["mean"] + spec["std"] * z
+    elif dist == "lognormal":
+        x = np.exp(spec["mu"] + spec["sigma"] * z)
+    elif dist == "uniform":
+        x = spec["low"] + (spec["high"] - spec["low"]) * _norm_cdf(z)
+    elif dist == "triangular":
+        low, mode, high = spec["low"], spec["mode"], spec["high"]
+        u = _norm_cdf(z)
+        split = (mode - low) / (high - low)
+        x = np.where(u < split,
+                     low + np.sqrt(u * (high - low) * (mode - low)),
+                     high - np.sqrt((1 - u) * (high - low) * (high - mode)))
+    elif dist == "fixed":
+        x = np.full_like(z, spec["value"])
+    else:
+        raise ValueError(f"Unknown distribution: {dist}")
+    return np.clip(x, spec.get("min", -np.inf), spec.get("max", np.inf))
+
+
+def sample(distributions, n, rng, correlation=None):
+    """Draw n joint samples; returns {variable: array}. `correlation` is a len(VARIABLES) square matrix."""
+    z = rng.standard_normal((n, len(VARIABLES)))
+    if correlation is not None:
+        z = z @ np.linalg.cholesky(np.asarray(correlation, dtype=float)).T
+    return {v: _from_normal(z[:, i], distributions[v]) for i, v in enumerate(VARIABLES)}
+
+
+def simulate(fundamentals, distributions, forecast_years, n_paths=100_000, correlation=None,
+             seed=None, chunk_size=250_000, fade_years=0):
+    """Intrinsic value per share for n_paths sampled scenarios.
+
+    `fundamentals` holds revenue, dep, capex, wc, cash, debt and shares (as produced by the
+    pipeline). Paths with WACC <= terminal growth have no terminal value and are dropped.
+    """
+    rng = np.random.default_rng(seed)
+    f = fundamentals
+    values = np.empty(n_paths)
+    for start in range(0, n_paths, chunk_size):
+        n = min(chunk_size, n_paths - start)
+        s = sample(distributions, n, rng, correlation)
+        fcf = free_cash_flow(f["revenue"] * s["ebit_margin"] / 100, s["tax_rate"], f["dep"], f["capex"], f["wc"])
+        iv = batch_dcf(fcf, s["revenue_growth"], s["discount_rate"], s["terminal_growth"], forecast_years,
+                       f["cash"], f["debt"], f["shares"], fade_years)["intrinsic_value"]
+        values[start:start + n] = np.where(s["discount_rate"] > s["terminal_growth"], iv, np.nan)
+
+    valid = values[np.isfinite(values)]
+    return {
+        "values": valid,
+        "n_paths": n_paths,
+        "n_valid": len(valid),
+        "mean": float(valid.mean()) if len(valid) else np.nan,
+        "std": float(valid.std()) if len(valid) else np.nan,
+        "percentiles": dict(zip(PERCENTILES, np.percentile(valid, PERCENTILES).tolist())) if len(valid) else {},
+    }
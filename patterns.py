@@ -0,0 +1,267 @@
+import numpy as np
+import pandas as pd
+
+# --- Candlestick pattern library ---
+# Every detector works on NumPy OHLC arrays of shape (bars,) or (tickers, bars) and returns a
+# boolean array of the same shape, True on the bar that completes the pattern. Earlier bars
+# are reached by shifting along the last axis, so a whole panel is scanned in one pass.
+# Padding (NaN) never matches because every comparison with NaN is False.
+
+TREND_WINDOW = 10
+
+
+def _shift(x, k):
+    out = np.full_like(x, False if x.dtype == bool else np.nan)
+    out[..., k:] = x[..., :-k]
+    return out
+
+
+def _sma(x, window):
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] >= window:
+        out[..., window - 1:] = np.lib.stride_tricks.sliding_window_view(x, window, axis=-1).mean(axis=-1)
+    return out
+
+
+class _Bars:
+    """Derived per-bar quantities, computed once and shared by all detectors."""
+
+    def __init__(self, o, h, l, c, trend=True):
+        self.o, self.h, self.l, self.c = o, h, l, c
+        self._prev = {}
+        self.body = np.abs(c - o)
+        self.range = h - l
+        self.upper = h - np.maximum(o, c)
+        self.lower = np.minimum(o, c) - l
+        self.bull = c > o
+        self.bear = c < o
+        self.mid = (o + c) / 2
+        if trend:
+            # Trend going into the bar: prior close against its moving average.
+            sma = _sma(c, TREND_WINDOW)
+            self.uptrend = _shift(c, 1) > _shift(sma, 1)
+            self.downtrend = _shift(c, 1) < _shift(sma, 1)
+
+    def prev(self, k=1):
+        if k not in self._prev:
+            self._prev[k] = _Bars(*(_shift(x, k) for x in (self.o, self.h, self.l, self.c)), trend=False)
+        return self._prev[k]
+
+
+# --- Single-bar patterns ---
+def doji(b):
+    return b.body < b.range * 0.1
+
+
+def dragonfly_doji(b):
+    return doji(b) & (b.upper < b.range * 0.1) & (b.lower > b.range * 0.6)
+
+
+def gravestone_doji(b):
+    return doji(b) & (b.lower < b.range * 0.1) & (b.upper > b.range * 0.6)
+
+
+def long_legged_doji(b):
+    return doji(b) & (b.upper > b.range * 0.3) & (b.lower > b.range * 0.3)
+
+
+def spinning_top(b):
+    return (b.body >= b.range * 0.1) & (b.body < b.range * 0.3) & (b.upper > b.body) & (b.lower > b.body)
+
+
+def bullish_marubozu(b):
+    return b.bull & (b.body > b.range * 0.95)
+
+
+def bearish_marubozu(b):
+    return b.bear & (b.body > b.range * 0.95)
+
+
+def _hammer_shape(b):
+    return (b.lower > 2 * b.body) & (b.upper < b.body)
+
+
+def _inverted_shape(b):
+    return (b.upper > 2 * b.body) & (b.lower < b.body)
+
+
+def hammer(b):
+    return _hammer_shape(b) & b.downtrend
+
+
+def hanging_man(b):
+    return _hammer_shape(b) & b.uptrend
+
+
+def inverted_hammer(b):
+    return _inverted_shape(b) & b.downtrend
+
+
+def shooting_star(b):
+    return _inverted_shape(b) & b.uptrend
+
+
+# --- Two-bar patterns ---
+def bullish_engulfing(b):
+    p = b.prev()
+    return p.bear & b.bull & (b.o <= p.c) & (b.c >= p.o) & (b.body > p.body)
+
+
+def bearish_engulfing(b):
+    p = b.prev()
+    return p.bull & b.bear & (b.o >= p.c) & (b.c <= p.o) & (b.body > p.body)
+
+
+def bullish_harami(b):
+    p = b.prev()
+    return p.bear & b.bull & (b.o > p.c) & (b.c < p.o)
+
+
+def bearish_harami(b):
+    p = b.prev()
+    return p.bull & b.bear & (b.o < p.c) & (b.c > p.o)
+
+
+def piercing_line(b):
+    p = b.prev()
+    return p.bear & b.bull & (b.o < p.c) & (b.c > p.mid) & (b.c < p.o)
+
+
+def dark_cloud_cover(b):
+    p = b.prev()
+    return p.bull & b.bear & (b.o > p.c) & (b.c < p.mid) & (b.c > p.o)
+
+
+def tweezer_bottom(b):
+    p = b.prev()
+    return p.bear & b.bull & (np.abs(b.l - p.l) <= 0.05 * np.maximum(b.range, p.range)) & b.downtrend
+
+
+def tweezer_top(b):
+    p = b.prev()
+    return p.bull & b.bear & (np.abs(b.h - p.h) <= 0.05 * np.maximum(b.range, p.range)) & b.uptrend
+
+
+def inside_bar(b):
+    p = b.prev()
+    return (b.h < p.h) & (b.l > p.l)
+
+
+def outside_bar(b):
+    p = b.prev()
+    return (b.h > p.h) & (b.l < p.l)
+
+
+# --- Three-bar patterns ---
+def morning_star(b):
+    p1, p2 = b.prev(1), b.prev(2)
+    return (p2.bear & (p2.body > p2.range * 0.5) & (p1.body < p2.body * 0.3)
+            & (np.maximum(p1.o, p1.c) < p2.c) & b.bull & (b.c > p2.mid))
+
+
+def evening_star(b):
+    p1, p2 = b.prev(1), b.prev(2)
+    return (p2.bull & (p2.body > p2.range * 0.5) & (p1.body < p2.body * 0.3)
+            & (np.minimum(p1.o, p1.c) > p2.c) & b.bear & (b.c < p2.mid))
+
+
+def three_white_soldiers(b):
+    p1, p2 = b.prev(1), b.prev(2)
+    return (p2.bull & p1.bull & b.bull & (p1.c > p2.c) & (b.c > p1.c)
+            & (p1.o > p2.o) & (p1.o < p2.c) & (b.o > p1.o) & (b.o < p1.c)
+            & (p1.upper < p1.body * 0.3) & (b.upper < b.body * 0.3))
+
+
+def three_black_crows(b):
+    p1, p2 = b.prev(1), b.prev(2)
+    return (p2.bear & p1.bear & b.bear & (p1.c < p2.c) & (b.c < p1.c)
+            & (p1.o < p2.o) & (p1.o > p2.c) & (b.o < p1.o) & (b.o > p1.c)
+            & (p1.lower < p1.body * 0.3) & (b.lower < b.body * 0.3))
+
+
+def three_inside_up(b):
+    return _shift(bullish_harami(b), 1) & b.bull & (b.c > b.prev(2).o)
+
+
+def three_inside_down(b):
+    return _shift(bearish_harami(b), 1) & b.bear & (b.c < b.prev(2).o)
+
+
+def three_outside_up(b):
+    return _shift(bullish_engulfing(b), 1) & b.bull & (b.c > b.prev(1).c)
+
+
+def three_outside_down(b):
+    return _shift(bearish_engulfing(b), 1) & b.bear & (b.c < b.prev(1).c)
+
+
+# Display name -> (detector, bias)
+PATTERNS = {
+    "Doji": (doji, "neutral"),
+    "Dragonfly Doji": (dragonfly_doji, "bullish"),
+    "Gravestone Doji": (gravestone_doji, "bearish"),
+    "Long-Legged Doji": (long_legged_doji, "neutral"),
+    "Spinning Top": (spinning_top, "neutral"),
+    "Bullish Marubozu": (bullish_marubozu, "bullish"),
+    "Bearish Marubozu": (bearish_marubozu, "bearish"),
+    "Hammer": (hammer, "bullish"),
+    "Hanging Man": (hanging_man, "bearish"),
+    "Inverted Hammer": (inverted_hammer, "bullish"),
+    "Shooting Star": (shooting_star, "bearish"),
+    "Bullish Engulfing": (bullish_engulfing, "bullish"),
+    "Bearish Engulfing": (bearish_engulfing, "bearish"),
+    "Bullish Harami": (bullish_harami, "bullish"),
+    "Bearish Harami": (bearish_harami, "bearish"),
+    "Piercing Line": (piercing_line, "bullish"),
+    "Dark Cloud Cover": (dark_cloud_cover, "bearish"),
+    "Tweezer Bottom": (tweezer_bottom, "bullish"),
+    "Tweezer Top": (tweezer_top, "bearish"),
+    "Inside Bar": (inside_bar, "neutral"),
+    "Outside Bar": (outside_bar, "neutral"),
+    "Morning Star": (morning_star, "bullish"),
+    "Evening Star": (evening_star, "bearish"),
+    "Three White Soldiers": (three_white_soldiers, "bullish"),
+    "Three Black Crows": (three_black_crows, "bearish"),
+    "Three Inside Up": (three_inside_up, "bullish"),
+    "Three Inside Down": (three_inside_down, "bearish"),
+    "Three Outside Up": (three_outside_up, "bullish"),
+    "Three Outside Down": (three_outside_down, "bearish"),
+}
+
+
+def detect(open_, high, low, close, names=None):
+    """{pattern name: bool array} for OHLC arrays of shape (bars,) or (tickers, bars)."""
+    b = _Bars(*(np.asarray(x, dtype=float) for x in (open_, high, low, close)))
+    with np.errstate(invalid="ignore"):
+        return {name: PATTERNS[name][0](b) for name in (names or PATTERNS)}
+
+
+def scan_frame(df, names=None, pandas_ta=False):
+    """Per-bar pattern flags for one OHLC DataFrame.
+
+    With pandas_ta=True, pandas-ta's TA-Lib backed candle patterns (if both are installed)
+    are appended as extra columns.
+    """
+    flags = detect(df["Open"], df["High"], df["Low"], df["Close"], names)
+    out = pd.DataFrame(flags, index=df.index)
+    if pandas_ta:
+        try:
+            import pandas_ta  # noqa: F401  (registers the .ta accessor)
+            extra = df.rename(columns=str.lower).ta.cdl_pattern(name="all")
+            out = out.join((extra != 0).add_prefix("TA "))
+        except Exception:
+            pass
+    return out
+
+
+def scan_many(histories, names=None):
+    """Scan {ticker: OHLC DataFrame} in one pass; returns {pattern: DataFrame(dates x tickers)}."""
+    wide = {col: pd.DataFrame({t: h[col] for t, h in histories.items()}) for col in ("Open", "High", "Low", "Close")}
+    arrays = [wide[col].to_numpy(dtype=float).T for col in ("Open", "High", "Low", "Close")]
+    index, tickers = wide["Close"].index, wide["Close"].columns
+    return {name: pd.DataFrame(flag.T, index=index, columns=tickers) for name, flag in detect(*arrays, names).items()}
+
+
+def count_many(histories, names=None):
+    """Pattern occurrence counts as a tickers x patterns DataFrame."""
+    return pd.DataFrame({name: flags.sum() for name, flags in scan_many(histories, names).items()})
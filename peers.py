@@ -0,0 +1,160 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bulk import RateLimiter, _with_retries, throttled
+from market_data import default_store
+
+# --- Peer comparison ---
+# A shared sector/industry index of every ticker we have seen, plus a cached table of peer
+# multiples. Ranking the target against its peers is one vectorized pass over the table.
+
+MULTIPLES = {
+    "PE": "trailingPE",
+    "EV/EBITDA": "enterpriseToEbitda",
+    "P/B": "priceToBook",
+    "Div Yield %": "dividendYield",
+}
+
+# For these a lower multiple means cheaper; for dividend yield higher is cheaper.
+LOWER_IS_CHEAPER = {"PE": True, "EV/EBITDA": True, "P/B": True, "Div Yield %": False}
+
+PEER_TTL = 24 * 60 * 60
+MAX_PEERS = 500
+
+
+def symbol(ticker):
+    """Canonical form of a ticker (as typed, pasted or returned by a bulk run)."""
+    return str(ticker).strip().upper()
+
+
+class SectorIndex:
+    """ticker -> (name, sector, industry), one `index|<symbol>` entry per ticker in the shared store.
+
+    Replicas register into and read from the same store, so none can overwrite another's tickers.
+    Tickers are kept as symbol().
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else default_store()
+
+    def register(self, ticker, info):
+        self.store.set(f"index|{symbol(ticker)}", (info.get("shortName"), info.get("sector"), info.get("industry")))
+
+    def register_many(self, infos):
+        for ticker, info in infos.items():
+            self.register(ticker, info)
+
+    @property
+    def table(self):
+        rows = {}
+        for key in self.store.keys("index|"):
+            entry = self.store.get(key)
+            if entry is not None:
+                rows[key.split("|", 1)[1]] = entry[1]
+        return pd.DataFrame(list(rows.values()), columns=["Name", "Sector", "Industry"],
+                            index=pd.Index(list(rows), name="Ticker"))
+
+    def peers(self, ticker, by="Industry", limit=MAX_PEERS):
+        ticker = symbol(ticker)
+        table = self.table
+        if ticker not in table.index:
+            return []
+        same = table.index[(table[by] == table.loc[ticker, by]) & (table.index != ticker)]
+        return list(same[:limit])
+
+
+def multiples_from_info(info):
+    row = {name: info.get(field) for name, field in MULTIPLES.items()}
+    if row["Div Yield %"] is not None:
+        row["Div Yield %"] *= 100
+    row.update({
+        "Name": info.get("shortName"),
+        "Market Cap": info.get("marketCap"),
+        "Price": info.get("currentPrice") or info.get("regularMarketPrice"),
+        "EBITDA": info.get("ebitda"),
+        "Cash": info.get("totalCash"),
+        "Debt": info.get("totalDebt"),
+        "Shares": info.get("sharesOutstanding"),
+    })
+    return row
+
+
+def fetch_infos(provider, tickers, max_workers=16, calls_per_second=10, retries=2):
+    """{ticker: info} fetched concurrently; tickers that keep failing are left out."""
+    provider = throttled(provider, RateLimiter(calls_per_second))
+
+    def fetch(t):
+        try:
+            return t, _with_retries(lambda: provider.info(t), retries, 0.5)
+        except Exception:
+            return t, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Copied per task in this thread, so the active perf tracer counts the fetches.
+        futures = [pool.submit(contextvars.copy_context().run, fetch, t) for t in tickers]
+        return {t: info for t, info in (f.result() for f in futures) if info}
+
+
+def peer_table(provider, tickers, key=None, ttl=PEER_TTL, **fetch_kwargs):
+    """Multiples for `tickers` (indexed by symbol()) as a DataFrame, cached in the provider's store under `key`."""
+    tickers = list(dict.fromkeys(symbol(t) for t in tickers))
+    store = getattr(provider, "store", None)
+    if key and store is not None:
+        entry = store.get(f"peers|{key}")
+        if entry is not None and time.time() - entry[0] < ttl and set(tickers) <= set(entry[1].index):
+            return entry[1].loc[list(tickers)]
+
+    infos = fetch_infos(provider, tickers, **fetch_kwargs)
+    table = pd.DataFrame([multiples_from_info(i) for i in infos.values()], index=pd.Index(list(infos), name="Ticker"))
+    table = _numeric(table)
+    if key and store is not None:
+        store.set(f"peers|{key}", table)
+    return table
+
+
+def _numeric(table):
+    out = table.copy()
+    for col in out.columns.drop("Name"):
+        out[col] = pd.to_numeric(out[col], errors="coerce")
+    return out
+
+
+def relative_valuation(target, peers):
+    """Target vs peer multiples: peer median, percentile rank and the price implied by the median.
+
+    `target` is a multiples_from_info() row, `peers` a peer_table(). Ranks are the share of
+    peers with a lower value (ties count half), computed for every multiple at once.
+    """
+    names = list(MULTIPLES)
+    values = peers[names].to_numpy(dtype=float)
+    t = np.array([np.nan if target.get(n) is None else target[n] for n in names], dtype=float)
+
+    valid = np.isfinite(values)
+    with np.errstate(invalid="ignore"):
+        below = ((values < t) & valid).sum(axis=0)
+        equal = ((values == t) & valid).sum(axis=0)
+        count = valid.sum(axis=0)
+        pct = np.where(count > 0, (below + 0.5 * equal) / np.maximum(count, 1) * 100, np.nan)
+    median = np.array([np.nanmedian(values[:, i]) if count[i] else np.nan for i in range(len(names))])
+
+    price = target.get("Price") or np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied = {
+            "PE": price * median[0] / t[0],
+            "EV/EBITDA": ((median[1] * (target.get("EBITDA") or np.nan)) + (target.get("Cash") or 0)
+                          - (target.get("Debt") or 0)) / (target.get("Shares") or np.nan),
+            "P/B": price * median[2] / t[2],
+            "Div Yield %": price * t[3] / median[3] if median[3] else np.nan,
+        }
+    return pd.DataFrame({
+        "Target": t,
+        "Peer Median": median,
+        "Peers": count,
+        "Percentile": pct,
+        "Cheaper Than Peers": [(p < 50) == LOWER_IS_CHEAPER[n] if np.isfinite(p) else None for n, p in zip(names, pct)],
+        "Implied Price": [implied[n] for n in names],
+    }, index=pd.Index(names, name="Multiple"))
@@ -0,0 +1,125 @@
+import contextvars
+import io
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import pandas as pd
+
+# --- Instrumentation ---
+# Code anywhere in the pipeline calls perf.stage("fetch.info") / perf.count("network_calls");
+# both are no-ops unless a Tracer is active in the current context (one per Streamlit run,
+# CLI call or benchmark). Thread pools must submit work with contextvars.copy_context().run
+# for it to be traced. Stage names are prefixed fetch./parse./compute./render.
+
+_active = contextvars.ContextVar("alphastack_tracer", default=None)
+# Nesting depth travels with the context, so work submitted to a pool inside a stage nests under it.
+_depth = contextvars.ContextVar("alphastack_stage_depth", default=0)
+
+
+class Tracer:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self.thread = threading.current_thread().name
+
+    @contextmanager
+    def stage(self, name):
+        depth = _depth.get()
+        token = _depth.set(depth + 1)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            _depth.reset(token)
+            with self._lock:
+                self.spans.append({"stage": name, "start_ms": (start - self.origin) * 1000,
+                                   "duration_ms": (end - start) * 1000, "depth": depth,
+                                   "thread": threading.current_thread().name})
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def to_frame(self):
+        return pd.DataFrame(self.spans, columns=["stage", "start_ms", "duration_ms", "depth", "thread"])
+
+    def totals(self):
+        """Time per top-level category (fetch/parse/compute/render), from the owning thread's depth-0 spans.
+
+        Pool workers overlap in time, so their spans are never added to the wall-clock totals.
+        """
+        df = self.to_frame()
+        df = df[(df["depth"] == 0) & (df["thread"] == self.thread)]
+        return df.groupby(df["stage"].str.split(".").str[0])["duration_ms"].sum()
+
+    def to_chrome_trace(self):
+        """Trace Event JSON, viewable in chrome://tracing or ui.perfetto.dev."""
+        events = [{"name": s["stage"], "cat": s["stage"].split(".")[0], "ph": "X", "pid": os.getpid(),
+                   "tid": s["thread"], "ts": s["start_ms"] * 1000, "dur": s["duration_ms"] * 1000}
+                  for s in self.spans]
+        events += [{"name": k, "ph": "C", "pid": os.getpid(), "ts": 0, "args": {"value": v}}
+                   for k, v in self.counters.items()]
+        return json.dumps({"traceEvents": events})
+
+
+@contextmanager
+def stage(name):
+    tracer = _active.get()
+    if tracer is None:
+        yield
+    else:
+        with tracer.stage(name):
+            yield
+
+
+def count(name, n=1):
+    tracer = _active.get()
+    if tracer is not None:
+        tracer.count(name, n)
+
+
+def start():
+    """Create a Tracer and make it active for the rest of the current context (e.g. a Streamlit run)."""
+    tracer = Tracer()
+    _active.set(tracer)
+    return tracer
+
+
+# --- Profiling ---
+class Profile:
+    """cProfile (stdlib) or pyinstrument (if installed) behind one start()/stop() -> report API."""
+
+    def __init__(self, backend="cProfile"):
+        self.backend = backend
+        if backend == "pyinstrument":
+            from pyinstrument import Profiler
+
+            self._profiler = Profiler()
+        else:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        if self.backend == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self):
+        if self.backend == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=True, color=False)
+        import pstats
+
+        self._profiler.disable()
+        buf = io.StringIO()
+        pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative").print_stats(40)
+        return buf.getvalue()
@@ -0,0 +1,255 @@
+import hashlib
+import re
+import time
+
+import pandas as pd
+
+import perf
+from dcf import free_cash_flow, growth_path, implied_assumption
+from financials import company_summary, normalize
+from market_data import HistoryManager, default_provider, slice_history, track_staleness
+from patterns import scan_frame
+from projection import drivers_from_fundamentals, project, statement, value_projection
+from statements import StatementLibrary
+from stress import StressLibrary, scenario_prices
+
+# --- Valuation pipeline ---
+# fetch -> financials -> FCF -> DCF -> stress -> patterns, with no Streamlit dependency.
+# app3.py renders the result of run_valuation(); alphastack.py exposes it on the command line.
+
+DEFAULT_ASSUMPTIONS = {
+    "revenue_growth": 10.0,
+    "terminal_growth": 3.0,
+    "ebit_margin": 20.0,
+    "tax_rate": 25.0,
+    "discount_rate": 10.0,
+    "forecast_years": 5,
+    "fade_years": 0,
+}
+
+
+# --- Financials ---
+def fundamentals_from_upload(df, ticker=None, tax_rate=25.0):
+    """Latest-year fundamentals and multi-year revenue CAGR for `ticker` (or the only company) in an upload.
+
+    Also used for reported statements, which statements.normalize_statements() puts in the same layout.
+    """
+    table = normalize(df)
+    companies = table["Ticker"].unique()
+    if ticker is not None and ticker.upper() in companies:
+        table = table[table["Ticker"] == ticker.upper()]
+    elif len(companies) != 1:
+        raise ValueError(f"{ticker} not found in uploaded financials")
+    summary = company_summary(table, tax_rate).iloc[0]
+    fundamentals = {
+        "revenue": summary["Revenue"],
+        "ebit": summary["EBIT"],
+        "capex": summary["CapEx"],
+        "dep": summary["Dep"],
+        "wc": summary["ΔWC"],
+        "cash": summary["Cash"],
+        "debt": summary["Debt"],
+        "shares": summary["Shares"],
+    }
+    cagr = summary["Revenue CAGR %"]
+    return fundamentals, None if pd.isna(cagr) else round(float(cagr), 2)
+
+
+def fundamentals_from_info(info, ebit_margin):
+    # Last resort when neither an upload nor reported statements are available.
+    revenue = info.get("totalRevenue") or 1000
+    return {
+        "revenue": revenue,
+        "ebit": revenue * (ebit_margin / 100),
+        "capex": 100,
+        "dep": 50,
+        "wc": -20,
+        "cash": info.get("totalCash") or 100,
+        "debt": info.get("totalDebt") or 50,
+        "shares": info.get("sharesOutstanding") or 50,
+    }
+
+
+# --- Stress test ---
+def stress_scenarios(stats, event, price):
+    if not event:
+        return None
+    table = scenario_prices(stats, price)
+    return table if event == "All Events" else table[table["Event"] == event].reset_index(drop=True)
+
+
+# --- Technical patterns ---
+def pattern_flags(history, window):
+    """Scan the full history (so trend context is available) and keep the bars of `window`."""
+    flags = scan_frame(history.dropna(subset=["Open", "High", "Low", "Close"]))
+    return flags.loc[flags.index.isin(window.index)]
+
+
+# --- Pipeline ---
+def fetch_market_data(ticker, provider=None):
+    """All network-bound inputs for one ticker: info, the full price history, crisis stats and statements.
+
+    `stale` maps endpoints served from an expired cache entry (being refreshed in the background) to their age.
+    """
+    provider = provider or default_provider()
+    with track_staleness() as stale:
+        with perf.stage("fetch.history"):
+            history = HistoryManager(provider).full(ticker)
+        with perf.stage("fetch.info"):
+            info = provider.info(ticker)
+    with perf.stage("fetch.stress"):
+        stress = StressLibrary(provider).get(ticker, history)
+    with perf.stage("fetch.statements"):
+        try:
+            statements, statements_error = StatementLibrary(provider).get(ticker, info), None
+        except Exception as e:
+            # The valuation falls back to estimates, but says why instead of hiding the failure.
+            statements, statements_error = None, f"{type(e).__name__}: {e}"
+    return {"ticker": ticker, "info": info, "history": history, "stress": stress, "statements": statements,
+            "statements_error": statements_error, "stale": stale}
+
+
+def run_valuation(ticker, provider=None, financials=None, stress_event=None, **assumptions):
+    """Value one ticker end to end. `financials` is an optional uploaded statement DataFrame."""
+    provider = provider or default_provider()
+    data = fetch_market_data(ticker, provider)
+    return cached_valuation(getattr(provider, "store", None), data, financials, stress_event, **assumptions)
+
+
+# --- Shared valuation cache ---
+# Results are keyed by a fingerprint of everything value_market_data() reads, so any replica
+# sharing the store reuses a valuation another one computed from the same data and assumptions.
+# Every slider position is a new key, so entries expire after VALUATION_TTL seconds.
+
+VALUATION_TTL = 6 * 60 * 60
+
+
+def valuation_key(data, stress_event=None, **assumptions):
+    a = {**DEFAULT_ASSUMPTIONS, **assumptions}
+    h = hashlib.sha1(repr((data["ticker"], sorted(data["info"].items(), key=str), stress_event,
+                           sorted(a.items()))).encode())
+    # New bars only ever append, so the last one identifies the history.
+    for frame in (data["history"].tail(1), data.get("statements"), data.get("stress")):
+        if isinstance(frame, pd.DataFrame):
+            h.update(pd.util.hash_pandas_object(frame).to_numpy().tobytes())
+    return f"{data['ticker']}|valuation|{h.hexdigest()}"
+
+
+def cached_valuation(store, data, financials=None, stress_event=None, **assumptions):
+    """value_market_data() through a shared store. Uploaded financials are private and bypass it."""
+    if store is None or financials is not None:
+        return value_market_data(data, financials, stress_event, **assumptions)
+    key = valuation_key(data, stress_event, **assumptions)
+    entry = store.get(key)
+    if entry is not None and time.time() - entry[0] < VALUATION_TTL:
+        perf.count("valuation.shared_hits")
+        # The inputs match, but their staleness and fetch errors are this fetch's, not the one that computed it.
+        return {**entry[1], "data_age": dict(data.get("stale") or {}),
+                "statements_error": data.get("statements_error")}
+    result = value_market_data(data, None, stress_event, **assumptions)
+    store.set(key, result, max_age=VALUATION_TTL)
+    return result
+
+
+def value_market_data(data, financials=None, stress_event=None, **assumptions):
+    """The pure, I/O-free part of the pipeline, run on fetch_market_data() output.
+
+    `stress_event` is a CRISIS_PERIODS name, "All Events" or None.
+    """
+    a = {**DEFAULT_ASSUMPTIONS, **assumptions}
+    info, history = data["info"], data["history"]
+    with perf.stage("parse.financials"):
+        if financials is not None:
+            fundamentals, cagr = fundamentals_from_upload(financials, data["ticker"], a["tax_rate"])
+            if cagr is not None:
+                a["revenue_growth"] = cagr
+            source = "upload"
+        elif data.get("statements") is not None and not data["statements"].empty:
+            fundamentals, _ = fundamentals_from_upload(data["statements"], data["ticker"], a["tax_rate"])
+            source = "statements"
+        else:
+            fundamentals = fundamentals_from_info(info, a["ebit_margin"])
+            source = "estimate"
+
+    with perf.stage("compute.dcf"):
+        # Base-year FCF at the assumed margin: the quantity the projection (and Monte Carlo) grows.
+        fcf = float(free_cash_flow(fundamentals["revenue"] * a["ebit_margin"] / 100, a["tax_rate"],
+                                   fundamentals["dep"], fundamentals["capex"], fundamentals["wc"]))
+        # Revenue drives the forecast: EBIT at the assumed margin, D&A/CapEx/ΔWC at their base-year share of revenue.
+        growth = growth_path(a["revenue_growth"], a["terminal_growth"], a["forecast_years"], a["fade_years"])
+        projected = project(fundamentals["revenue"], growth, a["ebit_margin"], a["tax_rate"],
+                            **drivers_from_fundamentals(fundamentals))
+        valuation = value_projection(projected, a["discount_rate"], a["terminal_growth"],
+                                     fundamentals["cash"], fundamentals["debt"], fundamentals["shares"])
+        cash_flows = statement(projected, discounted=valuation["discounted"])
+        cash_flows.insert(1, "Growth %", growth)
+        cash_flows = cash_flows.rename(columns={"FCF": "Projected FCF"}).round(2)
+        intrinsic_val = float(valuation["intrinsic_value"])
+
+    price = float(history["Close"].iloc[-1])
+    with perf.stage("compute.reverse_dcf"):
+        # Reverse DCF: the growth / WACC at which the model reproduces today's price.
+        dcf_inputs = dict(fcf=fcf, revenue_growth=a["revenue_growth"], discount_rate=a["discount_rate"],
+                          terminal_growth=a["terminal_growth"], forecast_years=a["forecast_years"],
+                          cash=fundamentals["cash"], debt=fundamentals["debt"], shares=fundamentals["shares"],
+                          fade_years=a["fade_years"])
+        implied = {k: float(implied_assumption(price, k, **dcf_inputs)) for k in ("revenue_growth", "discount_rate")}
+    hist = slice_history(history, period="1mo")
+    with perf.stage("compute.patterns"):
+        flags = pattern_flags(history, hist)
+    with perf.stage("compute.stress"):
+        stress = stress_scenarios(data["stress"], stress_event, price)
+    return {
+        "ticker": data["ticker"],
+        "name": info.get("shortName", "N/A"),
+        "sector": info.get("sector", "N/A"),
+        "industry": info.get("industry", "N/A"),
+        "market_cap": info.get("marketCap", 0),
+        "pe_ratio": info.get("trailingPE", "N/A"),
+        "div_yield": (info.get("dividendYield") or 0.0) * 100,
+        "assumptions": a,
+        "fundamentals": {k: float(v) for k, v in fundamentals.items()},
+        "fundamentals_source": source,
+        "statements_error": data.get("statements_error"),
+        "fcf": fcf,
+        "cash_flows": cash_flows,
+        "ev": float(valuation["ev"]),
+        "equity_value": float(valuation["equity_value"]),
+        "intrinsic_value": intrinsic_val,
+        "price": price,
+        "upside_pct": (intrinsic_val - price) / price * 100,
+        "implied_growth": implied["revenue_growth"],
+        "implied_wacc": implied["discount_rate"],
+        "stress": stress,
+        "history": hist,
+        "pattern_flags": flags,
+        "patterns": {name: int(n) for name, n in flags.sum().items()},
+        # Age in seconds of any inputs served from an expired cache entry; empty when all were fresh.
+        "data_age": dict(data.get("stale") or {}),
+    }
+
+
+def summarize(result):
+    """JSON-friendly copy of a run_valuation() result (frames become records, history is dropped)."""
+    out = {k: v for k, v in result.items() if k not in ("cash_flows", "history", "stress", "pattern_flags")}
+    out["cash_flows"] = result["cash_flows"].to_dict(orient="records")
+    out["stress"] = None if result["stress"] is None else result["stress"].to_dict(orient="records")
+    return out
+
+
+def _slug(text):
+    return re.sub(r"\W+", "_", text.lower()).strip("_")
+
+
+def flatten(result):
+    """One flat row per ticker, for CSV output."""
+    row = {k: v for k, v in result.items() if not isinstance(v, (dict, pd.DataFrame)) and v is not None}
+    row.update({f"assumption_{k}": v for k, v in result["assumptions"].items()})
+    row.update(result["fundamentals"])
+    row.update({f"pattern_{_slug(k)}": v for k, v in result["patterns"].items()})
+    row.update({f"data_age_{k}_s": v for k, v in result.get("data_age", {}).items()})
+    if result["stress"] is not None:
+        for event in result["stress"].to_dict(orient="records"):
+            prefix = f"stress_{_slug(event['Event'])}"
+            row.update({f"{prefix}_{_slug(k)}": v for k, v in event.items() if k != "Event"})
+    return row
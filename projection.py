@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from dcf import discount_flows, free_cash_flow
+
+# --- Revenue-driven projection ---
+# Revenue compounds at per-year growth; EBIT, D&A, CapEx and ΔWC follow from it through
+# margin and %-of-revenue drivers, and FCF is derived year by year from those lines. Drivers
+# are scalars, per-company arrays (...) or per-year arrays (..., years), so one call projects
+# a single company or a whole screen. All rates are percentages.
+
+LINES = ["Revenue", "EBIT", "NOPAT", "D&A", "CapEx", "ΔWC", "FCF"]
+
+
+def drivers_from_fundamentals(fundamentals):
+    """D&A, CapEx and ΔWC as % of revenue in the base year, held constant over the forecast."""
+    revenue = np.asarray(fundamentals["revenue"], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "dep_pct": np.asarray(fundamentals["dep"], dtype=float) / revenue * 100,
+            "capex_pct": np.asarray(fundamentals["capex"], dtype=float) / revenue * 100,
+            "wc_pct": np.asarray(fundamentals["wc"], dtype=float) / revenue * 100,
+        }
+
+
+def project(revenue, growth, ebit_margin, tax_rate, dep_pct=0.0, capex_pct=0.0, wc_pct=0.0):
+    """Projected statement lines, each of shape (..., years).
+
+    `growth` is per-year growth of shape (..., years), e.g. dcf.growth_path(); NaN years are
+    past a row's horizon and stay NaN in every line. Per-company drivers are given with
+    shape (...) and broadcast over the years; per-year drivers have growth's full shape.
+    """
+    growth = np.asarray(growth, dtype=float)
+
+    def per_year(x):
+        x = np.asarray(x, dtype=float)
+        return x if x.ndim == growth.ndim else x[..., None]
+
+    revenue = per_year(revenue) * np.cumprod(1 + np.nan_to_num(growth) / 100, axis=-1)
+    revenue = np.where(np.isfinite(growth), revenue, np.nan)
+    ebit = revenue * per_year(ebit_margin) / 100
+    dep = revenue * per_year(dep_pct) / 100
+    capex = revenue * per_year(capex_pct) / 100
+    wc = revenue * per_year(wc_pct) / 100
+    return {
+        "Revenue": revenue,
+        "EBIT": ebit,
+        "NOPAT": ebit * (1 - per_year(tax_rate) / 100),
+        "D&A": dep,
+        "CapEx": capex,
+        "ΔWC": wc,
+        "FCF": free_cash_flow(ebit, per_year(tax_rate), dep, capex, wc),
+    }
+
+
+def value_projection(projection, discount_rate, terminal_growth, cash, debt, shares):
+    """DCF of a project() result; the terminal value grows the last projected FCF."""
+    return discount_flows(projection["FCF"], discount_rate, terminal_growth, cash, debt, shares)
+
+
+def statement(projection, index=None, discounted=None):
+    """Projected statement as a table: one row per year, or per (company, year) for batches.
+
+    `index` labels the leading axis of a batch (e.g. tickers); `discounted` adds a
+    Discounted FCF column from value_projection().
+    """
+    lines = dict(zip(projection, np.broadcast_arrays(*projection.values())))
+    if discounted is not None:
+        lines["Discounted FCF"] = np.where(np.isfinite(lines["FCF"]), discounted, np.nan)
+    years = np.arange(1, lines["FCF"].shape[-1] + 1)
+    if lines["FCF"].ndim == 1:
+        return pd.DataFrame({"Year": years, **lines})
+    labels = index if index is not None else range(lines["FCF"].shape[0])
+    table = pd.DataFrame({name: values.reshape(-1) for name, values in lines.items()},
+                         index=pd.MultiIndex.from_product([labels, years], names=["Ticker", "Year"]))
+    return table.dropna(subset=["FCF"])
@@ -0,0 +1,97 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from financials import COLUMNS
+
+# --- Reported fundamentals ---
+# yfinance's annual cash flow, income and balance sheet statements, reduced to the upload
+# template (Year, Revenue, EBIT, CapEx, Dep, ΔWC, Cash, Debt, Shares) so the rest of the
+# pipeline treats them exactly like an uploaded file. A ticker's table is cached until its
+# next fiscal year's report is due, i.e. fetched once per reporting cycle.
+
+# Template column -> (statement, candidate line items in order of preference, sign)
+LINE_ITEMS = {
+    "Revenue": ("financials", ["Total Revenue", "Operating Revenue"], 1),
+    "EBIT": ("financials", ["EBIT", "Operating Income"], 1),
+    "CapEx": ("cashflow", ["Capital Expenditure"], -1),
+    "Dep": ("cashflow", ["Depreciation And Amortization", "Depreciation Amortization Depletion",
+                         "Reconciled Depreciation"], 1),
+    # Cash-flow statements report the cash effect; the template wants the increase in working capital.
+    "ΔWC": ("cashflow", ["Change In Working Capital"], -1),
+    "Cash": ("balance_sheet", ["Cash And Cash Equivalents", "Cash Cash Equivalents And Short Term Investments"], 1),
+    "Debt": ("balance_sheet", ["Total Debt"], 1),
+    "Shares": ("balance_sheet", ["Ordinary Shares Number", "Share Issued"], 1),
+}
+
+# Annual reports typically land within this many days of the fiscal year end.
+REPORTING_LAG_DAYS = 90
+# Once the next report is overdue, look for it at most this often.
+RECHECK_TTL = 24 * 60 * 60
+
+
+def _line(statement, candidates, dates):
+    if statement is None or statement.empty:
+        return pd.Series(np.nan, index=dates)
+    for name in candidates:
+        if name in statement.index:
+            row = pd.to_numeric(statement.loc[name], errors="coerce")
+            row.index = pd.to_datetime(row.index)
+            return row.reindex(dates)
+    return pd.Series(np.nan, index=dates)
+
+
+def normalize_statements(statements, ticker, info=None):
+    """One row per fiscal year in the upload template layout, plus the fiscal Period end date."""
+    income = statements.get("financials")
+    if income is None or income.empty:
+        return pd.DataFrame(columns=["Ticker", "Period", *COLUMNS])
+    dates = pd.DatetimeIndex(pd.to_datetime(income.columns)).sort_values()
+    table = pd.DataFrame({col: sign * _line(statements.get(source), names, dates).to_numpy(dtype=float)
+                          for col, (source, names, sign) in LINE_ITEMS.items()}, index=dates)
+    if info:
+        # Missing balance-sheet items fall back to the latest quote data.
+        for col, key in (("Shares", "sharesOutstanding"), ("Cash", "totalCash"), ("Debt", "totalDebt")):
+            table[col] = table[col].fillna(info.get(key) or np.nan)
+    for col in ("Dep", "CapEx", "ΔWC"):
+        table[col] = table[col].fillna(0.0)
+    table.insert(0, "Year", dates.year.astype(float))
+    table.insert(0, "Period", dates.date)
+    table.insert(0, "Ticker", ticker.upper())
+    return table.dropna(subset=["Revenue", "EBIT"]).reset_index(drop=True)
+
+
+def next_report_due(table):
+    """When the fiscal year after the latest one in `table` should have been reported."""
+    if table.empty:
+        return 0.0
+    period = pd.Timestamp(max(table["Period"]))
+    return (period + pd.DateOffset(years=1) + pd.Timedelta(days=REPORTING_LAG_DAYS)).timestamp()
+
+
+class StatementLibrary:
+    def __init__(self, provider, store=None):
+        self.provider = provider
+        self.store = store if store is not None else getattr(provider, "store", None)
+        self._memory = {}
+
+    def get(self, ticker, info=None):
+        key = f"{ticker}|statements"
+        entry = self._memory.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+        now = time.time()
+        if entry is not None and (now < next_report_due(entry[1]) or now - entry[0] < RECHECK_TTL):
+            self._memory[key] = entry
+            return entry[1]
+
+        table = normalize_statements(self.provider.statements(ticker), ticker, info)
+        entry = (now, table)
+        self._memory[key] = entry
+        if self.store is not None:
+            self.store.set(key, table, stored_at=now)
+        return table
+
+    def precompute(self, tickers):
+        return {t: self.get(t) for t in tickers}
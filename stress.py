@@ -0,0 +1,117 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from market_data import HistoryManager, slice_history
+
+# --- Stress testing ---
+# Drawdown statistics for every crisis window, computed once per ticker from the full price
+# history and persisted, so a stress result for any ticker/event is a local lookup. When a
+# ticker has no prices for a window (e.g. listed later) its market index stands in.
+
+CRISIS_PERIODS = {
+    "COVID-19 (2020)": ("2020-02-01", "2020-04-01"),
+    "2008 Financial Crisis": ("2008-09-01", "2009-03-01"),
+    "Scam 1992": ("1992-03-01", "1992-07-01"),
+    "Dotcom Bubble": ("2000-03-01", "2002-03-01"),
+}
+
+STATS_COLUMNS = ["Event", "Start", "End", "Source", "Endpoint Change %", "Max Drawdown %",
+                 "Peak Date", "Trough Date", "Recovery Days", "Note"]
+
+# Stats for closed historical windows only change while a recovery is still pending.
+STRESS_TTL = 7 * 24 * 60 * 60
+
+
+def index_proxy(ticker):
+    if ticker.endswith(".NS"):
+        return "^NSEI"
+    if ticker.endswith(".BO"):
+        return "^BSESN"
+    return "^GSPC"
+
+
+def window_stats(close, start, end):
+    """Endpoint change, max drawdown, peak/trough dates and days to regain the peak for one window."""
+    window = slice_history(close, start=start, end=end)
+    if len(window) < 2:
+        return None
+    values = window.to_numpy(dtype=float)
+    running_peak = np.maximum.accumulate(values)
+    drawdown = values / running_peak - 1
+    trough = int(np.argmin(drawdown))
+    peak = int(np.argmax(values[:trough + 1]))
+
+    later = close[close.index >= window.index[trough]]
+    regained = np.flatnonzero(later.to_numpy(dtype=float) >= values[peak])
+    recovery_days = (later.index[regained[0]] - window.index[trough]).days if len(regained) else np.nan
+
+    return {
+        "Endpoint Change %": (values[-1] / values[0] - 1) * 100,
+        "Max Drawdown %": drawdown[trough] * 100,
+        "Peak Date": window.index[peak].date(),
+        "Trough Date": window.index[trough].date(),
+        "Recovery Days": recovery_days,
+    }
+
+
+def crisis_stats(history, source, periods=CRISIS_PERIODS):
+    close = history["Close"].dropna()
+    rows = []
+    for event, (start, end) in periods.items():
+        stats = window_stats(close, start, end)
+        rows.append({"Event": event, "Start": start, "End": end, "Source": source if stats else None, **(stats or {}),
+                     "Note": None if stats else f"no {source} prices in the window"})
+    return pd.DataFrame(rows, columns=STATS_COLUMNS)
+
+
+def scenario_prices(stats, price):
+    """Apply each event's endpoint move and max drawdown to today's price."""
+    out = stats.copy()
+    out["Price (Endpoint)"] = price * (1 + out["Endpoint Change %"] / 100)
+    out["Price (Max Drawdown)"] = price * (1 + out["Max Drawdown %"] / 100)
+    return out
+
+
+class StressLibrary:
+    def __init__(self, provider, store=None, ttl=STRESS_TTL):
+        self.prices = HistoryManager(provider)
+        self.store = store if store is not None else getattr(provider, "store", None)
+        self.ttl = ttl
+        self._memory = {}
+
+    def get(self, ticker, history=None):
+        key = f"{ticker}|stress"
+        entry = self._memory.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            self._memory[key] = entry
+            return entry[1]
+
+        table = self.compute(ticker, history)
+        entry = (time.time(), table)
+        self._memory[key] = entry
+        if self.store is not None:
+            self.store.set(key, table, stored_at=entry[0])
+        return table
+
+    def compute(self, ticker, history=None):
+        history = self.prices.full(ticker) if history is None else history
+        table = crisis_stats(history, ticker)
+        missing = table["Source"].isna()
+        if missing.any():
+            proxy = index_proxy(ticker)
+            try:
+                proxy_table = crisis_stats(self.prices.full(proxy), proxy)
+            except (OSError, KeyError, ValueError) as e:
+                # Rows stay empty, but say why rather than silently dropping out of the results.
+                table.loc[missing, "Note"] = f"index proxy {proxy} unavailable ({type(e).__name__}: {e})"
+            else:
+                table.loc[missing] = proxy_table.loc[missing].to_numpy()
+                table.loc[table["Source"].isna(), "Note"] = f"no {ticker} or {proxy} prices in the window"
+        return table
+
+    def precompute(self, tickers):
+        return {t: self.get(t) for t in tickers}